@@ -0,0 +1,122 @@
+"""
+Compare the per-call overhead and throughput of the HTTP sessions
+
+A local HTTP/1.1 server answers with a small and a large JSON payload,
+and each session sends the same number of GET requests through the
+Cumulus client:
+
+$ python -m benchmarks.transport --calls 2000
+
+A concurrent case sends the small requests from several threads
+sharing one client, as several workers talking to the same switch would.
+
+`HTTP2Session` is included when `httpx` and `h2` are installed.
+The local server only speaks HTTP/1.1, so it measures the client overhead
+and the shared connection pool, not HTTP/2 multiplexing.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests import Session
+from cumulus import Cumulus
+from cumulus.transport import Urllib3Session, HTTP2Session
+
+PAYLOADS = {
+    "small": json.dumps({"hostname": "leaf01", "uptime": 175827}).encode(),
+    "large": json.dumps({
+        "route": {
+            f"10.{i // 256 % 256}.{i % 256}.0/24": {
+                "protocol": {"bgp": {"via": {"169.254.0.1": {}}}}
+            }
+            for i in range(20000)
+        }
+    }).encode(),
+}
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *_):
+        pass
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content = PAYLOADS[self.path.rsplit("/", 1)[-1]]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def sessions() -> dict:
+    factories = {"requests": Session, "urllib3": Urllib3Session}
+    try:
+        HTTP2Session()
+        factories["http2"] = HTTP2Session
+    except ImportError:
+        pass
+    return factories
+
+
+def benchmark(url: str,
+              factory,
+              payload: str,
+              calls: int,
+              threads: int = 1) -> tuple:
+    api = Cumulus(url=url, auth=("cumulus", "password"),
+                  http_session=factory())
+    model = api.system
+
+    def run(count):
+        for _ in range(count):
+            model.get(payload)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        # warm up the connection pool
+        list(executor.map(run, [1] * threads))
+
+        start = time.perf_counter()
+        list(executor.map(run, [calls // threads] * threads))
+        elapsed = time.perf_counter() - start
+
+    calls = calls // threads * threads
+    return elapsed / calls, len(PAYLOADS[payload]) * calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1000,
+                        help="the number of small requests per session")
+    parser.add_argument("--threads", type=int, default=8,
+                        help="the number of threads of the concurrent case")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PayloadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"{'session':<10} {'payload':<8} {'threads':>7} "
+          f"{'us/call':>10} {'calls/s':>10} {'MB/s':>10}")
+    for name, factory in sessions().items():
+        for payload, calls, threads in (
+            ("small", args.calls, 1),
+            ("large", max(args.calls // 100, 10), 1),
+            ("small", args.calls, args.threads),
+        ):
+            per_call, throughput = benchmark(url, factory, payload, calls,
+                                             threads)
+            print(f"{name:<10} {payload:<8} {threads:>7} "
+                  f"{per_call * 1e6:>10.1f} {1 / per_call:>10.1f} "
+                  f"{throughput / 1e6:>10.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,11 @@
-from .api import Cumulus  # noqa: F401
+# Cumulus is resolved lazily so that light entry points, such as the
+# command-line interface, do not pay for importing the HTTP stack
+# before they need it.
+__all__ = ["Cumulus"]
+
+
+def __getattr__(name):
+    if name == "Cumulus":
+        from .api import Cumulus
+        return Cumulus
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,328 @@
+import json
+from bisect import insort
+from itertools import combinations
+from .base import RequestError
+from .util import url_safe
+
+# match fields with more conditions are only checked for exact duplicates
+MAX_SHADOW_CONDITIONS = 8
+
+
+def _rule_key(rule: dict) -> str:
+    """
+    Get a key of the rule that does not depend on the order of its keys
+    """
+    return json.dumps(rule, sort_keys=True)
+
+
+def _conditions(match: dict, path: tuple = ()) -> list:
+    """
+    Flatten a rule match into (path, value) conditions
+    A set of keys with empty values, e.g. {"22": {}, "80": {}},
+    matches any of them and is kept as a single condition
+    with a frozenset value.
+    """
+    conditions = []
+    for key, value in match.items():
+        if isinstance(value, dict) and value:
+            if all(item == {} for item in value.values()):
+                conditions.append((path + (key,), frozenset(value)))
+            else:
+                conditions.extend(_conditions(value, path + (key,)))
+        else:
+            conditions.append((path + (key,), repr(value)))
+    return conditions
+
+
+def _merge_diff(old: dict, new: dict) -> dict:
+    """
+    Get the changes from old to new
+    :return: the changed keys and the removed keys set to None
+    """
+    diff = {}
+    for key in old:
+        if key not in new:
+            diff[key] = None
+    for key, value in new.items():
+        if key not in old:
+            diff[key] = value
+        elif value != old[key]:
+            if isinstance(value, dict) and isinstance(old[key], dict):
+                diff[key] = _merge_diff(old[key], value)
+            else:
+                diff[key] = value
+    return diff
+
+
+def _split_diff(diff: dict, path: tuple = ()) -> tuple:
+    """
+    Split a diff into the changes to patch and the paths to delete
+    :return: the diff without the removed keys, which is empty
+        when nothing is left to patch, and the paths of the removed keys
+    """
+    changes, removals = {}, []
+    for key, value in diff.items():
+        if value is None:
+            removals.append(path + (key,))
+        elif isinstance(value, dict) and value:
+            nested, nested_removals = _split_diff(value, path + (key,))
+            removals.extend(nested_removals)
+            if nested:
+                changes[key] = nested
+        else:
+            changes[key] = value
+    return changes, removals
+
+
+class AclBuilder:
+    """
+    Build an ACL locally and push only the rules that changed
+    Rules are kept ordered by their numeric id. `plan` compares them
+    with the applied ACL rule by rule, so updating a single rule of a
+    large ACL sends that rule only.
+    :param str name: the name of the ACL
+    :param str acl_type: the type of the ACL, e.g. "ipv4" or "mac"
+
+    >>> acl = AclBuilder("EDGE_IN")
+    >>> acl.add(10, {"ip": {"protocol": "tcp", "dest-port": {"22": {}}}},
+                {"permit": {}})
+    >>> acl.add(20, {}, {"deny": {}})
+    >>> nv.revision.create()
+    >>> acl.patch(nv, nv.revision.rev)
+    {'added': ['10', '20'], 'removed': [], 'changed': [], 'moved': [],
+     'delete': [], 'patch': {'type': 'ipv4', 'rule': {...}}}
+    >>> nv.revision.apply()
+    """
+
+    def __init__(self, name: str, acl_type: str = "ipv4") -> None:
+        self.name = name
+        self.acl_type = acl_type
+
+        self._rules = {}
+        self._order = []
+
+    @classmethod
+    def from_config(cls, name: str, config: dict) -> "AclBuilder":
+        """
+        Build an ACL from its configuration
+        :param name: the name of the ACL
+        :param config: the ACL as returned by `acl.get(name)`
+        """
+        acl = cls(name, config.get("type", "ipv4"))
+        for rule_id, rule in (config.get("rule") or {}).items():
+            acl.set_rule(rule_id, rule)
+        return acl
+
+    def set_rule(self, rule_id, rule: dict) -> None:
+        """
+        Add or replace a rule
+        :param rule_id: the numeric id of the rule, which sets its order
+        :param rule: the rule configuration with `match` and `action`
+        """
+        rule_id = int(rule_id)
+        if rule_id not in self._rules:
+            insort(self._order, rule_id)
+        self._rules[rule_id] = rule
+
+    def add(self, rule_id, match: dict, action: dict) -> None:
+        """
+        Add or replace a rule from its match and action
+        :param rule_id: the numeric id of the rule, which sets its order
+        :param match: the match part of the rule
+        :param action: the action part of the rule
+        """
+        self.set_rule(rule_id, {"match": match, "action": action})
+
+    def remove(self, rule_id) -> None:
+        """
+        Remove a rule
+        :param rule_id: the id of the rule
+        """
+        rule_id = int(rule_id)
+        del self._rules[rule_id]
+        self._order.remove(rule_id)
+
+    @property
+    def rules(self) -> dict:
+        """
+        The rules in order, keyed by the id used by the API
+        """
+        return {str(rule_id): self._rules[rule_id] for rule_id in self._order}
+
+    def to_config(self) -> dict:
+        """
+        Get the full ACL configuration
+        """
+        return {"type": self.acl_type, "rule": self.rules}
+
+    def check(self) -> dict:
+        """
+        Find rules that can never match
+        A rule is a duplicate when an earlier rule has the same match,
+        and shadowed when an earlier rule matches on a subset of its
+        conditions. Sets of values, such as ports, count as a subset
+        when they contain fewer values, so `dest-port {80}` is shadowed
+        by an earlier `dest-port {80, 443}`.
+        Earlier rules are indexed by their conditions without the values
+        of the sets and by each value of their sets, and looked up by the
+        subsets of the conditions of the rule, so the check stays close
+        to linear in the number of rules. Rules with more than
+        `MAX_SHADOW_CONDITIONS` conditions are only checked against
+        rules with the same conditions and match-all rules.
+        :return: rule ids mapped to the id of the earlier rule
+            for duplicates and shadowed rules
+        """
+        duplicates, shadowed = {}, {}
+        # (conditions without set values, set values) -> rule id
+        exact = {}
+        # conditions without any set -> first rule id
+        first = {}
+        # (conditions without set values, set path) -> value -> rule ids
+        values = {}
+
+        for rule_id in self._order:
+            shape, sets = set(), {}
+            for path, value in _conditions(
+                self._rules[rule_id].get("match") or {}
+            ):
+                if isinstance(value, frozenset):
+                    shape.add((path, None))
+                    sets[path] = value
+                else:
+                    shape.add((path, value))
+            shape = frozenset(shape)
+
+            key = (shape, frozenset(sets.items()))
+            if key in exact:
+                duplicates[str(rule_id)] = str(exact[key])
+                continue
+
+            if len(shape) <= MAX_SHADOW_CONDITIONS:
+                subsets = (
+                    frozenset(subset)
+                    for size in range(len(shape) + 1)
+                    for subset in combinations(shape, size)
+                )
+            else:
+                subsets = (frozenset(), shape)
+            earlier = []
+            for subset in subsets:
+                paths = [path for path, value in subset if value is None]
+                if not paths:
+                    if subset in first:
+                        earlier.append(first[subset])
+                    continue
+                # the earlier rules of this shape whose sets hold
+                # every value of the sets of the rule
+                candidates = sorted((
+                    values.get((subset, path), {}).get(value, ())
+                    for path in paths for value in sets[path]
+                ), key=len)
+                if candidates[0]:
+                    found = set(candidates[0]).intersection(*candidates[1:])
+                    if found:
+                        earlier.append(min(found))
+            if earlier:
+                shadowed[str(rule_id)] = str(min(earlier))
+
+            exact[key] = rule_id
+            if sets:
+                for path, path_values in sets.items():
+                    index = values.setdefault((shape, path), {})
+                    for value in path_values:
+                        index.setdefault(value, set()).add(rule_id)
+            else:
+                first.setdefault(shape, rule_id)
+
+        return {"duplicates": duplicates, "shadowed": shadowed}
+
+    def plan(self, applied: dict) -> dict:
+        """
+        Compare the rules with the applied ACL
+        New and changed rules go to a single patch of the ACL. Removed
+        rules, and the parts changed rules lose, are deleted first
+        since a patch only adds and updates keys.
+        A rule whose configuration moved to another id is reported
+        as moved, on top of being removed and added.
+        :param applied: the applied ACL as returned by `acl.get(name)`,
+            empty if the ACL does not exist yet
+        :return: the rule ids that are added, removed, changed and moved,
+            the paths to delete and the payload to patch
+        """
+        applied_rules = {
+            str(int(rule_id)): rule
+            for rule_id, rule in (applied.get("rule") or {}).items()
+        }
+        rules = self.rules
+
+        added = [rule_id for rule_id in rules if rule_id not in applied_rules]
+        removed = [rule_id for rule_id in applied_rules
+                   if rule_id not in rules]
+        changed = [rule_id for rule_id in rules
+                   if rule_id in applied_rules
+                   and rules[rule_id] != applied_rules[rule_id]]
+
+        removed_rules = {}
+        for rule_id in removed:
+            removed_rules.setdefault(_rule_key(applied_rules[rule_id]),
+                                     rule_id)
+        moved = [
+            (removed_rules[_rule_key(rules[rule_id])], rule_id)
+            for rule_id in added
+            if _rule_key(rules[rule_id]) in removed_rules
+        ]
+
+        delete = [f'{url_safe(self.name)}/rule/{rule_id}'
+                  for rule_id in removed]
+        patch_rules = {rule_id: rules[rule_id] for rule_id in added}
+        for rule_id in changed:
+            diff, removals = _split_diff(
+                _merge_diff(applied_rules[rule_id], rules[rule_id])
+            )
+            delete.extend(
+                f'{url_safe(self.name)}/rule/{rule_id}/'
+                + "/".join(url_safe(key) for key in path)
+                for path in removals
+            )
+            if diff:
+                patch_rules[rule_id] = diff
+
+        patch = {}
+        if applied.get("type") != self.acl_type:
+            patch["type"] = self.acl_type
+        if patch_rules:
+            patch["rule"] = patch_rules
+
+        return {"added": added, "removed": removed, "changed": changed,
+                "moved": moved, "delete": delete, "patch": patch}
+
+    def patch(self, client, rev: str, applied: dict = None) -> dict:
+        """
+        Send the changed rules to the revision
+        :param client: the `Cumulus` client
+        :param rev: the revision on which to update configuration
+        :param applied: the applied ACL, fetched when not provided
+        :return: the plan that was sent, see `plan`
+        """
+        if applied is None:
+            try:
+                # defaults filled in by the server would look like
+                # configuration the rules lost
+                applied = client.acl.get(
+                    url_safe(self.name),
+                    endpoint_params={"rev": "applied", "filled": False}
+                )
+            except RequestError as error:
+                if error.response.status_code != 404:
+                    raise
+                applied = {}
+
+        plan = self.plan(applied)
+        for path in plan["delete"]:
+            client.acl.delete(rev, target_path=path)
+        if plan["patch"]:
+            client.acl.patch(rev=rev,
+                             data=plan["patch"],
+                             target_path=url_safe(self.name))
+
+        return plan
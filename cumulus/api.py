@@ -1,5 +1,7 @@
 from requests import Session
 from .base import Request
+from .profiling import Profiler
+from .query import QueryEngine
 from .models import (Revision, Root,
                      Router, Platform, Bridge,
                      Mlag, Evpn, Qos,
@@ -15,15 +17,22 @@ class Cumulus:
         in the format <protocol>://<host>:<port>
     :param tuple auth: Cumulus host authentication details
         in the format ('user', 'pass')
+    :param bool profile: record the time spent in each phase of
+        the requests in `profiler`, see `cumulus.profiling.Profiler`
 
     >>> api = Cumulus(url="http://127.0.0.1:8765",
                       auth=("user", "password"))
     """
 
-    def __init__(self, url: str, auth: tuple, http_session=Session()) -> None:
+    def __init__(self,
+                 url: str,
+                 auth: tuple,
+                 http_session=Session(),
+                 profile: bool = False) -> None:
         self.url = self._format_url(url)
         self.http_session = http_session
         self.http_session.auth = auth
+        self.profiler = Profiler() if profile else None
 
         self.revision = Revision(self, "revision")
         self.root = Root(self, "")
@@ -43,6 +52,8 @@ class Cumulus:
         self.user = User(self, "system/aaa/user")
         self.role = Role(self, "system/aaa/role")
 
+        self._query_engine = QueryEngine(self)
+
     @staticmethod
     def _format_url(url):
         """
@@ -61,5 +72,31 @@ class Cumulus:
         """
         return Request(
             url=f'{self.url}/system',
-            http_session=self.http_session
+            http_session=self.http_session,
+            profiler=self.profiler
         ).get()
+
+    def query(self,
+              selector: str,
+              rev: str = None,
+              strategy: str = "auto",
+              key_ttl: float = 0):
+        """
+        Get every value matching a wildcard selector
+        See `cumulus.query` for the selector syntax.
+        :param selector: the path to match, relative to the API root
+        :param rev: the revision to read, defaults to the applied one
+        :param strategy: "auto" to let the client choose between one GET
+            and concurrent GETs, or "parent" to always make one GET
+        :param key_ttl: the number of seconds the keys read by a previous
+            query may be reused for to make concurrent GETs of a few
+            objects, 0 to always read them again. Objects created since
+            are missing from the results.
+        >>> api.query("interface/*/ip/address")
+        {'interface/lo/ip/address': {'127.0.0.1/8': {}, '::1/128': {}},
+         'interface/eth0/ip/address': {'192.168.200.11/24': {}}}
+        >>> api.query("interface/*[type=swp]/link/mtu")
+        {'interface/swp1/link/mtu': 9216, ...}
+        """
+        return self._query_engine.run(selector, rev=rev, strategy=strategy,
+                                      key_ttl=key_ttl)
@@ -1,5 +1,9 @@
 import json
+import time
+from typing import Union
+from urllib.parse import urlsplit
 from requests import Session, Response
+from . import profiling
 
 
 class RequestError(Exception):
@@ -53,20 +57,32 @@ class Request:
 
     :param str url: A URL to the Cumulus host
     :param requests.Session http_session: A session to make requests
+    :param cumulus.profiling.Profiler profiler: A profiler to record
+        the request phases in, if any
     """
 
-    def __init__(self, url: str, http_session: Session) -> None:
+    def __init__(self,
+                 url: str,
+                 http_session: Session,
+                 profiler=None) -> None:
         self.url = url
         self.http_session = http_session
+        self.profiler = profiler
 
     def _send_request(self,
                       method: str,
                       data: dict = {},
-                      params: dict = {}) -> dict:
+                      params: dict = {},
+                      decode: bool = True) -> Union[dict, str]:
         """
         Send a request to the API server
+        :param decode: return the decoded JSON body,
+            or the body as text when False
         :raises RequestError: if response status is >=400
         """
+        if self.profiler is not None:
+            return self._send_profiled_request(method, data, params, decode)
+
         headers = {'Content-Type': 'application/json'}
 
         response = self.http_session.request(
@@ -79,17 +95,85 @@ class Request:
         if not response.ok:
             raise RequestError(response)
 
+        if not decode:
+            return response.text
+
         try:
             return response.json()
         except json.JSONDecodeError:
             raise InvalidData(response)
 
+    def _send_profiled_request(self,
+                               method: str,
+                               data: dict,
+                               params: dict,
+                               decode: bool):
+        """
+        Send a request to the API server and record the time of each phase
+        The payload is encoded here instead of in the HTTP session
+        to time it separately.
+        :raises RequestError: if response status is >=400
+        """
+        headers = {'Content-Type': 'application/json'}
+        endpoint = profiling.endpoint(
+            method, urlsplit(self.url).path.replace("/nvue_v1", "", 1)
+        )
+        phases = {}
+
+        start = time.perf_counter()
+        body = json.dumps(data).encode("utf-8")
+        encoded = time.perf_counter()
+        phases["encode"] = encoded - start
+
+        response = None
+        try:
+            response = self.http_session.request(
+                method=method,
+                url=self.url,
+                data=body,
+                params=params,
+                headers=headers
+            )
+            received = time.perf_counter()
+            elapsed = getattr(response, "elapsed", None)
+            wait = elapsed.total_seconds() if elapsed else 0.0
+            phases["wait"] = min(wait, received - encoded)
+            phases["transfer"] = received - encoded - phases["wait"]
+
+            if not response.ok:
+                raise RequestError(response)
+            if decode:
+                try:
+                    result, peak_memory = self.profiler.decode(response)
+                except json.JSONDecodeError:
+                    raise InvalidData(response)
+                phases["decode"] = time.perf_counter() - received
+            else:
+                result, peak_memory = response.text, 0
+        except Exception:
+            self.profiler.record(
+                endpoint, time.perf_counter() - start, phases, error=True,
+                size=len(response.content) if response is not None else 0
+            )
+            raise
+
+        self.profiler.record(endpoint, time.perf_counter() - start, phases,
+                             size=len(response.content),
+                             peak_memory=peak_memory)
+        return result
+
     def get(self, params: dict = {}) -> dict:
         """
         Make a GET request
         """
         return self._send_request(method="get", params=params)
 
+    def get_text(self, params: dict = {}) -> str:
+        """
+        Make a GET request and return the body without decoding it
+        """
+        return self._send_request(method="get", params=params, decode=False)
+
     def post(self, data: dict = {}, params: dict = {}):
         """
         Make a POST request
@@ -0,0 +1,225 @@
+"""
+Command-line interface to run Cumulus API operations across a fleet
+
+Results are printed as newline-delimited JSON, one line per host,
+as soon as each host finishes:
+
+$ cumulus -i inventory.json health
+{"host": "leaf02", "result": {"hostname": "leaf02", ...}}
+{"host": "leaf01", "error": "The request for URL ... failed ..."}
+
+Only the standard library is imported at module level so that argument
+parsing and `--help` stay fast. The HTTP stack is loaded once a command runs.
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def _load_data(path: str) -> dict:
+    with open(path) as data_file:
+        return json.load(data_file)
+
+
+def _get(nv, path: str, rev: str):
+    params = {"rev": rev} if rev else {}
+    return nv.root.get(path, endpoint_params=params)
+
+
+def _diff(nv, rev: str, against: str):
+    return nv.root.diff(revision_a=rev, revision_b=against)
+
+
+def _patch(nv, data: dict, path: str, replace: bool):
+    nv.revision.create()
+    if replace:
+        nv.root.delete(nv.revision.rev, target_path=path)
+    nv.root.patch(rev=nv.revision.rev, data=data, target_path=path)
+    return {"revision": nv.revision.rev}
+
+
+def _health(nv):
+    return nv.health()
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"{value!r} is not a positive integer"
+        )
+    return number
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cumulus",
+        description="Run Cumulus API operations across many switches "
+                    "and stream the results as JSON lines"
+    )
+    parser.add_argument(
+        "-i", "--inventory", required=True,
+        help="a JSON inventory file with the hosts to run on"
+    )
+    parser.add_argument(
+        "-c", "--concurrency", type=_positive_int, default=10,
+        help="the maximum number of hosts processed at once (default: 10)"
+    )
+    parser.add_argument(
+        "-l", "--limit",
+        help="a comma-separated list of hosts from the inventory to run on"
+    )
+    parser.add_argument(
+        "-t", "--transport", default="requests",
+        choices=("requests", "urllib3", "http2"),
+        help="the HTTP client to use (default: requests)"
+    )
+    parser.add_argument(
+        "-u", "--user", default=os.environ.get("CUMULUS_USER"),
+        help="the user for hosts without credentials in the inventory "
+             "(default: $CUMULUS_USER)"
+    )
+    parser.add_argument(
+        "-p", "--password", default=os.environ.get("CUMULUS_PASSWORD"),
+        help="the password for hosts without credentials in the inventory "
+             "(default: $CUMULUS_PASSWORD)"
+    )
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get = commands.add_parser("get", help="get the configuration")
+    get.add_argument("path", nargs="?", default="",
+                     help="a path relative to the API root")
+    get.add_argument("--rev", help="the revision to read (default: applied)")
+
+    diff = commands.add_parser("diff", help="diff two revisions")
+    diff.add_argument("rev", help="the revision to compare")
+    diff.add_argument("--against", default="applied",
+                      help="the revision to compare with (default: applied)")
+
+    for name, description in (
+        ("patch", "patch the configuration in a new revision"),
+        ("apply", "patch the configuration in a new revision and apply it"),
+    ):
+        command = commands.add_parser(name, help=description)
+        command.add_argument("data", help="a JSON file with the payload")
+        command.add_argument("--path", default="",
+                             help="a path relative to the API root")
+        command.add_argument("--replace", action="store_true",
+                             help="delete the configuration on the path "
+                                  "before patching it")
+        if name == "apply":
+            command.add_argument("--retries", type=int, default=60,
+                                 help="the number of checks for the "
+                                      "revision to be applied (default: 60)")
+            command.add_argument("--sleep", type=int, default=1,
+                                 help="the number of seconds between "
+                                      "checks (default: 1)")
+            command.add_argument("--journal",
+                                 help="a file to record the progress of "
+                                      "every host in")
+            command.add_argument("--resume", action="store_true",
+                                 help="skip the hosts completed in the "
+                                      "journal and continue the revisions "
+                                      "left in progress")
+
+    commands.add_parser("health", help="check the connection to the hosts")
+
+    return parser
+
+
+def _operation(args: argparse.Namespace) -> tuple:
+    """
+    Get the operation with its arguments for the parsed command
+    """
+    if args.command == "get":
+        return _get, (args.path, args.rev)
+    if args.command == "diff":
+        return _diff, (args.rev, args.against)
+    if args.command == "patch":
+        return _patch, (_load_data(args.data), args.path, args.replace)
+    return _health, ()
+
+
+def _session_factory(transport: str):
+    """
+    Get the HTTP session class for the transport name
+    """
+    if transport == "urllib3":
+        from .transport import Urllib3Session
+        return Urllib3Session
+    if transport == "http2":
+        from .transport import HTTP2Session
+        return HTTP2Session
+    from requests import Session
+    return Session
+
+
+def main(argv: list = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "apply" and args.resume and not args.journal:
+        parser.error("--resume requires --journal")
+
+    from .fleet import Fleet, load_inventory
+    from .journal import Journal
+
+    inventory = load_inventory(args.inventory)
+    hosts = args.limit.split(",") if args.limit else None
+    unknown = set(hosts or []) - set(inventory)
+    if unknown:
+        parser.error("unknown hosts: {}".format(", ".join(sorted(unknown))))
+
+    missing = []
+    for name in hosts or inventory:
+        host = inventory[name]
+        if not host.get("auth"):
+            if args.user is None or args.password is None:
+                missing.append(name)
+            host["auth"] = (args.user, args.password)
+    if missing:
+        parser.error(
+            "no credentials for hosts: {}; set them in the inventory, "
+            "with -u/-p or with $CUMULUS_USER/$CUMULUS_PASSWORD".format(
+                ", ".join(sorted(missing))
+            )
+        )
+
+    fleet = Fleet(inventory,
+                  concurrency=args.concurrency,
+                  session_factory=_session_factory(args.transport))
+    if args.command == "apply":
+        results = fleet.apply(
+            _load_data(args.data),
+            target_path=args.path,
+            replace=args.replace,
+            retries=args.retries,
+            sleep_time=args.sleep,
+            journal=Journal(args.journal) if args.journal else None,
+            resume=args.resume,
+            hosts=hosts
+        )
+    else:
+        operation, operation_args = _operation(args)
+        results = fleet.run(operation, *operation_args, hosts=hosts)
+
+    failed = False
+    for host, result, error in results:
+        if error is None:
+            line = {"host": host, "result": result}
+        else:
+            failed = True
+            line = {"host": host, "error": str(error)}
+        sys.stdout.write(json.dumps(line, default=str) + "\n")
+        sys.stdout.flush()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests import Session
+from .api import Cumulus
+from .base import RequestError
+from .journal import Journal
+
+
+def load_inventory(path: str) -> dict:
+    """
+    Load a JSON inventory file
+    Host entries inherit any key from the optional `defaults` section.
+    :param path: a path to the inventory file
+
+    >>> load_inventory("inventory.json")
+    {'leaf01': {'url': 'https://10.0.0.1:8765',
+                'auth': ('cumulus', 'password'),
+                'verify': False}}
+
+    The file is in the following format:
+    {"defaults": {"auth": ["cumulus", "password"], "verify": false},
+     "hosts": {"leaf01": {"url": "https://10.0.0.1:8765"}}}
+    """
+    with open(path) as inventory_file:
+        inventory = json.load(inventory_file)
+
+    defaults = inventory.get("defaults", {})
+    hosts = {}
+    for name, details in inventory.get("hosts", {}).items():
+        host = dict(defaults)
+        host.update(details)
+        if host.get("auth"):
+            host["auth"] = tuple(host["auth"])
+        hosts[name] = host
+
+    return hosts
+
+
+def _payload_hash(payload,
+                  target_path: str = "",
+                  replace: bool = False) -> str:
+    """
+    Get a hash identifying what an apply does on a host
+    :param payload: the payload to patch
+    :param target_path: the path the payload is patched on
+    :param replace: whether the configuration on the path is replaced
+    """
+    return hashlib.sha256(json.dumps(
+        {"data": payload, "target_path": target_path, "replace": replace},
+        sort_keys=True
+    ).encode()).hexdigest()
+
+
+class Fleet:
+    """
+    Run the same operation against many Cumulus hosts in parallel
+    :param dict inventory: host names mapped to their connection details,
+        see `load_inventory`
+    :param int concurrency: the maximum number of hosts processed at once
+    :param session_factory: a callable returning a new HTTP session,
+        e.g. `cumulus.transport.Urllib3Session`
+
+    >>> fleet = Fleet(load_inventory("inventory.json"), concurrency=20)
+    >>> for host, result, error in fleet.run(lambda nv: nv.health()):
+    ...     print(host, result, error)
+    leaf01 {'build': 'Cumulus Linux 5.3.0', ...} None
+    """
+
+    def __init__(self,
+                 inventory: dict,
+                 concurrency: int = 10,
+                 session_factory=Session) -> None:
+        self.inventory = inventory
+        self.concurrency = concurrency
+        self.session_factory = session_factory
+
+        self._clients = {}
+
+    def client(self, host: str) -> Cumulus:
+        """
+        Get the API client of a host
+        Each host has its own HTTP session, so connections and
+        credentials are never shared between hosts.
+        :param host: the name of the host in the inventory
+        """
+        if host not in self._clients:
+            details = self.inventory[host]
+            http_session = self.session_factory()
+            http_session.verify = details.get("verify", True)
+            self._clients[host] = Cumulus(
+                url=details["url"],
+                auth=details.get("auth"),
+                http_session=http_session
+            )
+        return self._clients[host]
+
+    def _run(self, operation, *args, hosts: list = None, **kwargs):
+        """
+        Run the operation for every host in a thread pool
+        :param operation: a callable receiving the host name
+            followed by `args` and `kwargs`
+        """
+        hosts = list(self.inventory) if hosts is None else hosts
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(operation, host, *args, **kwargs): host
+                for host in hosts
+            }
+            for future in as_completed(futures):
+                host = futures[future]
+                try:
+                    yield host, future.result(), None
+                except Exception as error:
+                    yield host, None, error
+
+    def run(self, operation, *args, hosts: list = None, **kwargs):
+        """
+        Run the operation on every host and yield results as hosts finish
+        :param operation: a callable receiving the host client
+            followed by `args` and `kwargs`
+        :param hosts: the names of the hosts to run on,
+            defaults to the whole inventory
+        :return: a generator of (host, result, error) tuples
+            where error is the raised exception or None
+        """
+        def run_on_client(host, *args, **kwargs):
+            return operation(self.client(host), *args, **kwargs)
+
+        return self._run(run_on_client, *args, hosts=hosts, **kwargs)
+
+    def apply(self,
+              data,
+              target_path: str = "",
+              replace: bool = False,
+              retries: int = 60,
+              sleep_time: int = 1,
+              journal: Journal = None,
+              resume: bool = False,
+              hosts: list = None):
+        """
+        Patch and apply the configuration on every host
+        Each host goes through the stages of `Journal`: a revision is
+        created, patched, applied and verified. With a journal, every
+        completed stage is recorded, and a resumed run skips verified hosts
+        and re-attaches to the revisions that were left in flight.
+        Entries recorded for another payload, target path or replace flag
+        are ignored, so those hosts start over with a new revision.
+        :param data: the payload to patch, or a callable receiving the host
+            name and returning its payload
+        :param target_path: a path to the configuration part
+            relative to the API root
+        :param replace: delete the configuration on the path before patching
+        :param retries: the number of checks for the revision to be applied
+        :param sleep_time: the number of seconds between the checks
+        :param journal: the journal to record the stages in
+        :param resume: continue from the stages recorded in the journal
+        :param hosts: the names of the hosts to run on,
+            defaults to the whole inventory
+        :return: a generator of (host, result, error) tuples
+            where error is the raised exception or None
+
+        >>> journal = Journal("rollout.jsonl")
+        >>> for host, result, error in fleet.apply(config, journal=journal,
+        ...                                        resume=True):
+        ...     print(host, result, error)
+        leaf01 {'revision': '3', 'resumed': True, 'skipped': True} None
+        """
+        progress = journal.load() if journal and resume else {}
+
+        return self._run(
+            self._apply, data, target_path, replace,
+            retries, sleep_time, journal, progress, hosts=hosts
+        )
+
+    def _apply(self,
+               host: str,
+               data,
+               target_path: str,
+               replace: bool,
+               retries: int,
+               sleep_time: int,
+               journal: Journal,
+               progress: dict) -> dict:
+        """
+        Bring a host through the apply stages
+        """
+        payload = data(host) if callable(data) else data
+        digest = _payload_hash(payload, target_path, replace)
+
+        entry = progress.get(host)
+        if entry and entry.get("payload") != digest:
+            entry = None
+        if entry and entry["stage"] == Journal.VERIFIED:
+            return {"revision": entry["rev"], "resumed": True, "skipped": True}
+
+        nv = self.client(host)
+
+        def record(stage):
+            if journal:
+                journal.record(host, stage, rev=nv.revision.rev,
+                               payload=digest)
+
+        stage = self._resume(nv, entry) if entry else None
+        if stage == Journal.VERIFIED:
+            record(Journal.VERIFIED)
+            return {"revision": nv.revision.rev,
+                    "resumed": True,
+                    "skipped": True}
+
+        if stage is None:
+            nv.revision.create()
+            record(Journal.CREATED)
+            stage = Journal.CREATED
+
+        if stage == Journal.CREATED:
+            if replace:
+                nv.root.delete(nv.revision.rev, target_path=target_path)
+            nv.root.patch(rev=nv.revision.rev,
+                          data=payload,
+                          target_path=target_path)
+            record(Journal.PATCHED)
+            stage = Journal.PATCHED
+
+        if stage == Journal.PATCHED:
+            nv.revision.apply()
+            record(Journal.APPLIED)
+
+        if not nv.revision.is_applied(retries=retries, sleep_time=sleep_time):
+            revision = nv.revision.config or {}
+            raise Exception(
+                "Revision {} was not applied: state {}, transition {}".format(
+                    nv.revision.rev,
+                    revision.get("state"),
+                    json.dumps(revision.get("transition"))
+                )
+            )
+        record(Journal.VERIFIED)
+
+        return {"revision": nv.revision.rev, "resumed": entry is not None}
+
+    @staticmethod
+    def _resume(nv: Cumulus, entry: dict):
+        """
+        Re-attach the client to the revision recorded in the journal
+        :return: the stage to continue from,
+            or None to start over with a new revision
+        """
+        if not entry.get("rev"):
+            return None
+
+        try:
+            revision = nv.revision.switch(entry["rev"])
+        except RequestError:
+            # the revision is gone, e.g. after a reboot of the switch
+            return None
+
+        state = revision.get("state", "")
+        if state == "applied":
+            return Journal.VERIFIED
+        if state == "pending":
+            return entry["stage"] if entry["stage"] in (
+                Journal.CREATED, Journal.PATCHED
+            ) else Journal.PATCHED
+        if state in ("invalid", "error") or state.endswith("_fail"):
+            return None
+
+        # the apply is in progress, only wait for it
+        return Journal.APPLIED
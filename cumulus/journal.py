@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+import time
+
+
+class Journal:
+    """
+    An append-only journal of fleet operations
+    Every stage a host goes through is appended as a JSON line
+    and flushed to disk before the operation moves on, so an interrupted
+    run can be resumed from the last recorded stage of each host.
+    :param str path: a path to the journal file
+
+    >>> journal = Journal("rollout.jsonl")
+    >>> journal.record("leaf01", Journal.CREATED, rev="3", payload="9f86d0")
+    >>> journal.load()
+    {'leaf01': {'time': 1684155023.3, 'host': 'leaf01',
+                'stage': 'created', 'rev': '3', 'payload': '9f86d0'}}
+    """
+    CREATED = "created"
+    PATCHED = "patched"
+    APPLIED = "applied"
+    VERIFIED = "verified"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self._lock = threading.Lock()
+
+    def record(self,
+               host: str,
+               stage: str,
+               rev: str = None,
+               payload: str = None) -> None:
+        """
+        Append a stage of the host to the journal
+        :param host: the name of the host
+        :param stage: the stage the host has completed
+        :param rev: the revision the stage belongs to
+        :param payload: a hash of the configuration the stage applies
+        """
+        line = json.dumps({
+            "time": time.time(),
+            "host": host,
+            "stage": stage,
+            "rev": rev,
+            "payload": payload
+        })
+        with self._lock, open(self.path, "a+b") as journal_file:
+            # end a partially written line left by a crash,
+            # so that it does not swallow this entry
+            if journal_file.seek(0, os.SEEK_END):
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":
+                    line = "\n" + line
+            journal_file.write((line + "\n").encode())
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def load(self) -> dict:
+        """
+        Get the last recorded entry of each host
+        A partially written last line left by a crash is ignored.
+        """
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+
+        with open(self.path) as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entries[entry["host"]] = entry
+
+        return entries
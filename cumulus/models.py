@@ -1,8 +1,25 @@
+import asyncio
+import functools
 import time
 from .base import Request
+from .rib import RibTable
 from .util import url_safe
 
 
+def _profiled(method):
+    """
+    Record the calls to the model method when the client is profiled
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.client.profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        with profiler.model(f"{type(self).__name__}.{method.__name__}"):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class BaseModel:
     """
     The base that each model shares
@@ -34,6 +51,7 @@ class BaseModel:
             return self.url
         return f'{self.url}/{target_path}'
 
+    @_profiled
     def get(self, target_path: str = "", endpoint_params: dict = {}):
         """
         Get object configuration on a specific path
@@ -56,12 +74,14 @@ class BaseModel:
         request: dict = Request(
             url=url,
             http_session=self.client.http_session,
+            profiler=self.client.profiler
         ).get(params=params)
 
         self.config = request
 
         return self.config
 
+    @_profiled
     def patch(self,
               rev: str,
               data: dict,
@@ -88,16 +108,18 @@ class BaseModel:
         True
         """
         url = self._make_path(target_path)
-        params = endpoint_params
+        params = dict(endpoint_params)
         params['rev'] = rev
 
         request = Request(
             url=url,
-            http_session=self.client.http_session
+            http_session=self.client.http_session,
+            profiler=self.client.profiler
         ).patch(data, params=params)
 
         return request
 
+    @_profiled
     def post(self, target_path: str = "", endpoint_params: dict = {}):
         """
         Make a POST request on the model
@@ -109,9 +131,11 @@ class BaseModel:
         params = endpoint_params
         return Request(
             url=url,
-            http_session=self.client.http_session
+            http_session=self.client.http_session,
+            profiler=self.client.profiler
         ).post(params=params)
 
+    @_profiled
     def delete(self,
                rev: str,
                target_path: str = "",
@@ -132,15 +156,94 @@ class BaseModel:
         True
         """
         url = self._make_path(target_path)
-        params = endpoint_params
+        params = dict(endpoint_params)
         params['rev'] = rev
 
         return Request(
             url=url,
-            http_session=self.client.http_session
+            http_session=self.client.http_session,
+            profiler=self.client.profiler
         ).delete(params=params)
 
 
+class _ApplyTracker:
+    """
+    Turn successive snapshots of a revision into change events
+    and pick the interval until the next snapshot
+    """
+    FINISHED_STATES = ("applied", "applied_and_saved", "abandoned",
+                       "invalid", "ays_no", "confirm_no")
+    PROMPT_STATES = ("ays",)
+
+    def __init__(self,
+                 min_interval: float,
+                 max_interval: float,
+                 backoff: float) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+        self.interval = min_interval
+        self.start = time.monotonic()
+        self.phase_start = self.start
+        self.phases = {}
+        self.state = None
+        self.progress = None
+        self.issues = set()
+
+    @property
+    def finished(self) -> bool:
+        return self.state is not None and (
+            self.state in self.FINISHED_STATES or self.state.endswith("_fail")
+        )
+
+    def update(self, revision: dict) -> list:
+        """
+        Get the events for the snapshot of the revision
+        """
+        now = time.monotonic()
+        elapsed = round(now - self.start, 3)
+        transition = revision.get("transition") or {}
+        events = []
+
+        state = revision.get("state")
+        if state != self.state:
+            event = {"type": "state", "state": state,
+                     "previous": self.state, "elapsed": elapsed}
+            if self.state is not None:
+                duration = round(now - self.phase_start, 3)
+                self.phases[self.state] = duration + self.phases.get(
+                    self.state, 0
+                )
+                event["duration"] = duration
+            self.state = state
+            self.phase_start = now
+            if self.finished:
+                event["phases"] = dict(self.phases)
+            events.append(event)
+
+        progress = transition.get("progress")
+        if progress and progress != self.progress:
+            events.append({"type": "progress", "progress": progress,
+                           "state": state, "elapsed": elapsed})
+        self.progress = progress
+
+        for issue_id, issue in (transition.get("issue") or {}).items():
+            if issue_id not in self.issues:
+                self.issues.add(issue_id)
+                events.append({"type": "issue", "id": issue_id,
+                               "issue": issue, "state": state,
+                               "elapsed": elapsed})
+
+        if events:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff,
+                                self.max_interval)
+
+        return events
+
+
 class Revision(BaseModel):
 
     def __init__(self, client, endpoint: str) -> None:
@@ -153,7 +256,8 @@ class Revision(BaseModel):
         """
         request = Request(
             url=self.url,
-            http_session=self.client.http_session
+            http_session=self.client.http_session,
+            profiler=self.client.profiler
         ).post()
 
         # revision name is set only key of the dictionary
@@ -176,7 +280,8 @@ class Revision(BaseModel):
 
         request = Request(
             url=url,
-            http_session=self.client.http_session
+            http_session=self.client.http_session,
+            profiler=self.client.profiler
         ).patch(data=apply_payload)
 
         return request
@@ -201,6 +306,88 @@ class Revision(BaseModel):
 
         return False
 
+    def watch(self,
+              timeout: float = 300,
+              min_interval: float = 0.2,
+              max_interval: float = 5,
+              backoff: float = 1.5):
+        """
+        Follow the revision while it is applied
+        Yields an event only when the state or progress changes or
+        a new issue shows up, and stops once the apply is finished.
+        Polling starts every `min_interval` seconds and slows down by
+        `backoff` up to `max_interval` while nothing changes.
+        Are-you-sure prompts are answered with yes as `apply` does.
+        State events carry the duration of the previous state and
+        the final one the time spent in each state.
+        :param timeout: the number of seconds to follow the revision for
+        :param min_interval: the shortest time between two polls
+        :param max_interval: the longest time between two polls
+        :param backoff: the factor to slow polling down by
+        :raises TimeoutError: if the apply does not finish in time
+
+        >>> api.revision.apply()
+        >>> for event in api.revision.watch():
+        ...     print(event)
+        {'type': 'state', 'state': 'apply', 'previous': None, 'elapsed': 0.0}
+        {'type': 'progress', 'progress': 'Reloading', ...}
+        {'type': 'state', 'state': 'applied', 'previous': 'apply',
+         'elapsed': 9.1, 'duration': 9.1, 'phases': {'apply': 9.1}}
+        """
+        tracker = _ApplyTracker(min_interval, max_interval, backoff)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            for event in self._track(tracker):
+                yield event
+            if tracker.finished:
+                return
+            if time.monotonic() + tracker.interval > deadline:
+                raise TimeoutError(
+                    f"Revision {self.rev} is still {tracker.state} "
+                    f"after {timeout} seconds"
+                )
+            time.sleep(tracker.interval)
+
+    async def awatch(self,
+                     timeout: float = 300,
+                     min_interval: float = 0.2,
+                     max_interval: float = 5,
+                     backoff: float = 1.5):
+        """
+        Asynchronous version of `watch`
+        Requests run in the default executor of the event loop.
+
+        >>> async for event in api.revision.awatch():
+        ...     print(event)
+        """
+        loop = asyncio.get_running_loop()
+        tracker = _ApplyTracker(min_interval, max_interval, backoff)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            events = await loop.run_in_executor(None, self._track, tracker)
+            for event in events:
+                yield event
+            if tracker.finished:
+                return
+            if time.monotonic() + tracker.interval > deadline:
+                raise TimeoutError(
+                    f"Revision {self.rev} is still {tracker.state} "
+                    f"after {timeout} seconds"
+                )
+            await asyncio.sleep(tracker.interval)
+
+    def _track(self, tracker: _ApplyTracker) -> list:
+        """
+        Poll the revision once and answer a pending prompt
+        """
+        events = tracker.update(self.refresh())
+        state_changed = events and events[0]["type"] == "state"
+        if state_changed and tracker.state in tracker.PROMPT_STATES:
+            self.apply()
+        return events
+
     def refresh(self):
         """
         Update the revision properties in-place
@@ -315,6 +502,34 @@ class Vrf(BaseModel):
     def __init__(self, client, endpoint: str) -> None:
         super().__init__(client, endpoint)
 
+    def rib(self,
+            name: str = "default",
+            afi: str = "ipv4",
+            endpoint_params: dict = {}) -> RibTable:
+        """
+        Get a compact snapshot of the routing table of the VRF
+        The routes are packed into a `RibTable` as soon as they are
+        received and are not kept in `config`.
+        :param name: the name of the VRF
+        :param afi: the address family, "ipv4" or "ipv6"
+        :param endpoint_params: any params accepted by the endpoint
+
+        >>> rib = api.vrf.rib("default")
+        >>> rib.lookup("10.1.2.3")
+        {'prefix': '10.1.0.0/16', 'protocol': 'bgp',
+         'nexthops': ('169.254.0.1',)}
+        >>> rib.diff(api.vrf.rib("default"))
+        {'added': {}, 'removed': {}, 'changed': {}}
+        """
+        url = self._make_path(f'{url_safe(name)}/router/rib/{afi}/route')
+        routes = Request(
+            url=url,
+            http_session=self.client.http_session,
+            profiler=self.client.profiler
+        ).get(params=endpoint_params)
+
+        return RibTable.from_routes(routes, afi)
+
 
 class Nve(BaseModel):
 
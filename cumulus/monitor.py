@@ -0,0 +1,268 @@
+import heapq
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from .base import Request
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(samples: list, percent: float) -> float:
+    """
+    Get the nearest-rank percentile of sorted samples
+    """
+    index = max(math.ceil(percent / 100 * len(samples)) - 1, 0)
+    return samples[min(index, len(samples) - 1)]
+
+
+class HealthMonitor:
+    """
+    Probe many Cumulus hosts on a schedule and report state changes
+    Every host is probed once per `interval` seconds, shifted by a random
+    jitter so that probes of a fleet do not all fire at once. Probes
+    reuse the HTTP session of each client, so connections are kept alive.
+    Subscribers are only called when a host goes up or down,
+    or when its uptime goes back which means it rebooted.
+    :param dict clients: host names mapped to their `Cumulus` client,
+        e.g. built with `Fleet.client`
+    :param float interval: the number of seconds between two probes
+        of the same host
+    :param float jitter: the fraction of the interval to randomly shift
+        each probe by
+    :param int concurrency: the maximum number of probes in flight
+    :param int down_after: the number of failed probes in a row
+        before a host is reported down
+    :param int history: the number of latency samples kept per host
+    :param str probe_path: the path to probe relative to the API root
+
+    >>> monitor = HealthMonitor({host: fleet.client(host)
+    ...                          for host in fleet.inventory},
+    ...                         interval=10)
+    >>> monitor.subscribe(print)
+    >>> monitor.start()
+    {'host': 'leaf01', 'type': 'up', 'previous': None, 'time': ...}
+    {'host': 'leaf01', 'type': 'reboot', 'uptime': 12, ...}
+    >>> monitor.status("leaf01")
+    {'up': True, 'uptime': 22, 'failures': 0, 'reboots': 1,
+     'latency': {'p50': 0.012, 'p90': 0.019, 'p99': 0.031, 'max': 0.031},
+     ...}
+    >>> monitor.stop()
+    """
+
+    def __init__(self,
+                 clients: dict,
+                 interval: float = 10,
+                 jitter: float = 0.1,
+                 concurrency: int = 20,
+                 down_after: int = 1,
+                 history: int = 100,
+                 probe_path: str = "system") -> None:
+        self.clients = clients
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.down_after = down_after
+        self.probe_path = probe_path
+
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._hosts = {
+            host: {
+                "up": None,
+                "uptime": None,
+                "failures": 0,
+                "reboots": 0,
+                "last_probe": None,
+                "last_change": None,
+                "error": None,
+                "latency": deque(maxlen=history),
+            }
+            for host in clients
+        }
+
+        self._condition = threading.Condition()
+        self._schedule = []
+        self._stopped = threading.Event()
+        self._thread = None
+        self._executor = None
+
+    def subscribe(self, callback) -> None:
+        """
+        Call the callback with every state change
+        :param callback: a callable receiving an event dictionary
+            with `host`, `type` ("up", "down" or "reboot") and `time`
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        """
+        Stop calling the callback
+        """
+        self._subscribers.remove(callback)
+
+    def _emit(self, event: dict) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Health monitor subscriber failed")
+
+    def probe(self, host: str) -> None:
+        """
+        Probe a host once and notify subscribers of any change
+        :param host: the name of the host
+        """
+        client = self.clients[host]
+        start = time.perf_counter()
+        try:
+            system = Request(
+                url=f'{client.url}/{self.probe_path}',
+                http_session=client.http_session,
+                profiler=client.profiler
+            ).get()
+            error = None
+        except Exception as exception:
+            system, error = {}, exception
+        latency = time.perf_counter() - start
+        now = time.time()
+
+        events = []
+        with self._lock:
+            state = self._hosts[host]
+            state["last_probe"] = now
+            if error is None:
+                state["failures"] = 0
+                state["error"] = None
+                state["latency"].append(latency)
+                uptime = system.get("uptime")
+                if (uptime is not None and state["uptime"] is not None
+                        and uptime < state["uptime"]):
+                    state["reboots"] += 1
+                    events.append({"host": host, "type": "reboot",
+                                   "uptime": uptime,
+                                   "previous_uptime": state["uptime"],
+                                   "time": now})
+                if uptime is not None:
+                    state["uptime"] = uptime
+                if state["up"] is not True:
+                    events.append({"host": host, "type": "up",
+                                   "previous": state["up"], "time": now})
+                    state["up"] = True
+                    state["last_change"] = now
+            else:
+                state["failures"] += 1
+                state["error"] = str(error)
+                if (state["up"] is not False
+                        and state["failures"] >= self.down_after):
+                    events.append({"host": host, "type": "down",
+                                   "previous": state["up"],
+                                   "error": str(error), "time": now})
+                    state["up"] = False
+                    state["last_change"] = now
+
+        for event in events:
+            self._emit(event)
+
+    def run_once(self) -> None:
+        """
+        Probe every host once, concurrently, and wait for the results
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            wait([executor.submit(self.probe, host) for host in self.clients])
+
+    def status(self, host: str = None) -> dict:
+        """
+        Get the tracked state of the hosts
+        :param host: the name of a host, all hosts when not provided
+        :return: the state of the host, or host names mapped to their state,
+            with latency percentiles in seconds
+        """
+        if host is None:
+            return {name: self.status(name) for name in self.clients}
+
+        with self._lock:
+            state = dict(self._hosts[host])
+            samples = sorted(state.pop("latency"))
+
+        state["latency"] = {
+            "p50": _percentile(samples, 50),
+            "p90": _percentile(samples, 90),
+            "p99": _percentile(samples, 99),
+            "max": samples[-1],
+        } if samples else {}
+        return state
+
+    def _next_probe(self) -> float:
+        return time.monotonic() + self.interval * (
+            1 + random.uniform(-self.jitter, self.jitter)
+        )
+
+    def _reschedule(self, host: str) -> None:
+        with self._condition:
+            heapq.heappush(self._schedule, (self._next_probe(), host))
+            self._condition.notify()
+
+    def _run(self) -> None:
+        """
+        Submit probes as they become due until the monitor is stopped
+        """
+        while not self._stopped.is_set():
+            with self._condition:
+                if not self._schedule:
+                    self._condition.wait()
+                    continue
+                due, host = self._schedule[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._schedule)
+
+            # the next probe of the host is only scheduled once this one
+            # is done, so a slow host never has two probes in flight
+            future = self._executor.submit(self.probe, host)
+            future.add_done_callback(
+                lambda _, host=host: self._reschedule(host)
+            )
+
+    def start(self) -> None:
+        """
+        Start probing in the background
+        The first probes are spread over the interval.
+        """
+        if self._thread is not None:
+            raise Exception("The health monitor is already running")
+
+        self._stopped.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        now = time.monotonic()
+        with self._condition:
+            self._schedule = [
+                (now + random.uniform(0, self.interval), host)
+                for host in self.clients
+            ]
+            heapq.heapify(self._schedule)
+
+        self._thread = threading.Thread(
+            target=self._run, name="cumulus-health-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop probing and wait for the probes in flight
+        """
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        self._thread = None
+        self._executor = None
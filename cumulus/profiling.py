@@ -0,0 +1,267 @@
+import atexit
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PHASES = ("encode", "wait", "transfer", "decode", "model")
+# collections whose next path segment is the name of an object
+COLLECTIONS = frozenset((
+    "acl", "address", "domain", "interface", "neighbor", "peer",
+    "peer-group", "revision", "role", "route", "rule", "user", "vlan",
+    "vni", "vrf",
+))
+
+
+def endpoint(method: str, path: str) -> str:
+    """
+    Get the name of the endpoint of a request
+    Revision ids, object names and numeric ids in the path are replaced
+    with placeholders, so calls to different objects of a collection
+    are recorded together.
+    :param method: the HTTP method
+    :param path: the path of the request relative to the API root
+
+    >>> endpoint("PATCH", "/interface/swp12/link")
+    'PATCH /interface/{name}/link'
+    >>> endpoint("GET", "/revision/17")
+    'GET /revision/{rev}'
+    """
+    segments = []
+    collection = None
+    for segment in path.strip("/").split("/"):
+        if collection == "revision":
+            segment = "{rev}"
+        elif collection is not None:
+            segment = "{name}"
+        elif segment.isdigit():
+            segment = "{id}"
+        collection = segment if segment in COLLECTIONS else None
+        segments.append(segment)
+    return "{} /{}".format(method.upper(), "/".join(segments))
+
+
+class Profiler:
+    """
+    Collect the time spent in each phase of the requests per endpoint
+    The phases of a request are:
+    - encode: serializing the payload to JSON
+    - wait: sending the request until the response headers arrive,
+      which covers the network and the processing on the switch
+    - transfer: downloading the body and the HTTP client overhead
+    - decode: parsing the JSON response
+    Requests are recorded per endpoint, with the object names in the path
+    replaced, see `endpoint`. Calls to the models are recorded as
+    `<Model>.<method>` with a `model` phase for the time spent outside
+    of the requests.
+    Decoding one in `trace_every` responses of at least `trace_size`
+    bytes is traced with tracemalloc to record the peak memory it takes.
+    Tracing slows decoding down several times, which shows in the
+    decode phase of the sampled calls. Tracing is process-wide, so traced
+    decodes run one at a time and the peak also counts what other threads
+    allocate meanwhile.
+    :param int trace_size: the response size to trace allocations from
+    :param int trace_every: the sampling rate of large responses
+
+    >>> api = Cumulus(url="https://127.0.0.1:8765",
+                      auth=("cumulus", "password"),
+                      profile=True)
+    >>> api.interface.get()
+    >>> print(api.profiler.report())
+    endpoint                  calls  errors   total ms ...
+    GET /interface                1       0      912.4 ...
+    """
+
+    def __init__(self,
+                 trace_size: int = 1 << 20,
+                 trace_every: int = 10) -> None:
+        self.trace_size = trace_size
+        self.trace_every = trace_every
+
+        self._large_responses = 0
+        self._lock = threading.Lock()
+        self._trace_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+
+    def _endpoint_stats(self, endpoint: str) -> dict:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {
+                "calls": 0,
+                "errors": 0,
+                "total": 0.0,
+                "max": 0.0,
+                "bytes": 0,
+                "peak_memory": 0,
+                "phases": {},
+            }
+        return stats
+
+    def record(self,
+               endpoint: str,
+               total: float,
+               phases: dict,
+               error: bool = False,
+               size: int = 0,
+               peak_memory: int = 0) -> None:
+        """
+        Record a call to an endpoint
+        :param endpoint: the name of the endpoint, e.g. "GET /interface"
+        :param total: the number of seconds the call took
+        :param phases: phase names mapped to the number of seconds
+        :param error: whether the call failed
+        :param size: the size of the response in bytes
+        :param peak_memory: the peak memory taken by decoding in bytes
+        """
+        with self._lock:
+            stats = self._endpoint_stats(endpoint)
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["total"] += total
+            stats["max"] = max(stats["max"], total)
+            stats["bytes"] += size
+            stats["peak_memory"] = max(stats["peak_memory"], peak_memory)
+            for phase, seconds in phases.items():
+                stats["phases"][phase] = (
+                    stats["phases"].get(phase, 0.0) + seconds
+                )
+
+        # let the model calls on this thread know how long requests took
+        for frame in getattr(self._local, "models", ()):
+            frame[0] += total
+
+    @contextmanager
+    def model(self, name: str):
+        """
+        Record a call to a model
+        :param name: the name of the call, e.g. "Interface.get"
+        """
+        models = getattr(self._local, "models", None)
+        if models is None:
+            models = self._local.models = []
+
+        # the time spent in requests and nested model calls
+        frame = [0.0]
+        models.append(frame)
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            total = time.perf_counter() - start
+            models.pop()
+            own = max(total - frame[0], 0.0)
+            with self._lock:
+                stats = self._endpoint_stats(name)
+                stats["calls"] += 1
+                stats["errors"] += int(error)
+                stats["total"] += total
+                stats["max"] = max(stats["max"], total)
+                stats["phases"]["model"] = (
+                    stats["phases"].get("model", 0.0) + own
+                )
+            for parent in models:
+                parent[0] += own
+
+    def decode(self, response):
+        """
+        Decode a JSON response, tracing its allocations if it is
+        a sampled large one
+        :return: the decoded data and the peak memory in bytes of the
+            whole process while decoding, 0 when it was not traced
+        """
+        if len(response.content) < self.trace_size:
+            return response.json(), 0
+
+        with self._lock:
+            sampled = self._large_responses % self.trace_every == 0
+            self._large_responses += 1
+        if not sampled:
+            return response.json(), 0
+
+        # tracemalloc is global, so another traced decode would stop it
+        with self._trace_lock:
+            if tracemalloc.is_tracing():
+                return response.json(), 0
+            tracemalloc.start()
+            try:
+                data = response.json()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return data, peak
+
+    def stats(self) -> dict:
+        """
+        Get the collected statistics
+        :return: endpoints mapped to their number of calls and errors,
+            total and maximum seconds, response bytes, decoding peak
+            memory in bytes and seconds per phase
+        """
+        with self._lock:
+            return {
+                endpoint: dict(stats, phases=dict(stats["phases"]))
+                for endpoint, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        """
+        Drop the collected statistics
+        """
+        with self._lock:
+            self._stats = {}
+
+    def report(self, format: str = "text") -> str:
+        """
+        Format the statistics, slowest endpoints first
+        :param format: "text" for a table or "json"
+        """
+        stats = sorted(self.stats().items(),
+                       key=lambda item: item[1]["total"],
+                       reverse=True)
+        if format == "json":
+            return json.dumps(dict(stats), indent=2)
+
+        lines = ["{:<40} {:>6} {:>6} {:>10} {:>9} {:>9} {:>9} {:>9} "
+                 "{:>9} {:>9} {:>10}".format(
+                     "endpoint", "calls", "errors", "total ms", "mean ms",
+                     *(f"{phase} ms" for phase in PHASES), "peak KiB")]
+        for endpoint, endpoint_stats in stats:
+            calls = endpoint_stats["calls"]
+            lines.append(
+                "{:<40} {:>6} {:>6} {:>10.1f} {:>9.1f} {:>9.1f} {:>9.1f} "
+                "{:>9.1f} {:>9.1f} {:>9.1f} {:>10.0f}".format(
+                    endpoint, calls, endpoint_stats["errors"],
+                    endpoint_stats["total"] * 1000,
+                    endpoint_stats["total"] * 1000 / calls,
+                    *(endpoint_stats["phases"].get(phase, 0.0) * 1000 / calls
+                      for phase in PHASES),
+                    endpoint_stats["peak_memory"] / 1024
+                )
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: str, format: str = None) -> None:
+        """
+        Write the report to a file
+        :param path: the file to write to
+        :param format: "text" or "json", guessed from the file extension
+            when not provided
+        """
+        if format is None:
+            format = "json" if path.endswith(".json") else "text"
+        with open(path, "w") as report_file:
+            report_file.write(self.report(format) + "\n")
+
+    def dump_at_exit(self, path: str, format: str = None) -> None:
+        """
+        Write the report to a file when the interpreter exits
+        :param path: the file to write to
+        :param format: "text" or "json", see `dump`
+        """
+        atexit.register(self.dump, path, format)
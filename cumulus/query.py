@@ -0,0 +1,321 @@
+"""
+Wildcard selectors over the API tree
+
+A selector is a path relative to the API root where a segment can be
+`*` to match any key, optionally followed by predicates on the values
+below the matched key:
+
+    interface/*/ip/address
+    interface/*[type=swp][link.state.up]/link/mtu
+    bridge/domain/*/vlan/*/vni
+
+A predicate is either `key=value` or just `key` to only require the key,
+and nested keys are separated with dots.
+"""
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from json.decoder import scanstring
+from .base import Request, RequestError
+from .util import url_safe
+
+_SEGMENT = re.compile(r'^([^\[\]]*)((?:\[[^\[\]]+\])*)$')
+_PREDICATE = re.compile(r'\[([^\[\]=]+)(?:=([^\[\]]*))?\]')
+# everything up to the next bracket outside of strings
+_PLAIN = re.compile(r'(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*')
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class Segment:
+    """
+    A compiled part of a selector
+    :param str key: the key to match, or None to match any key
+    :param tuple predicates: (key path, expected value or None) pairs
+        the matched value must satisfy
+    """
+
+    def __init__(self, key: str, predicates: tuple = ()) -> None:
+        self.key = key
+        self.predicates = predicates
+
+    @property
+    def literal(self) -> bool:
+        return self.key is not None and not self.predicates
+
+    def matches_key(self, key: str) -> bool:
+        return self.key is None or self.key == key
+
+    def matches_value(self, value) -> bool:
+        for path, expected in self.predicates:
+            found = value
+            for key in path:
+                if not isinstance(found, dict) or key not in found:
+                    return False
+                found = found[key]
+            if expected is None:
+                continue
+            if not isinstance(found, str):
+                found = json.dumps(found)
+            if found != expected:
+                return False
+        return True
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> tuple:
+    """
+    Compile a selector into segments
+    Compiled selectors are cached.
+    :raises ValueError: if the selector is malformed
+    """
+    segments = []
+    for part in selector.strip("/").split("/"):
+        match = _SEGMENT.match(part)
+        if not part or not match:
+            raise ValueError(f"Invalid selector segment {part!r}")
+        key, predicates = match.groups()
+        segments.append(Segment(
+            None if key == "*" else key,
+            tuple(
+                (tuple(path.split(".")), value if value else None)
+                for path, value in _PREDICATE.findall(predicates)
+            )
+        ))
+    return tuple(segments)
+
+
+def select(data, segments: tuple, path: tuple = ()):
+    """
+    Evaluate segments on decoded data
+    :return: a generator of (path, value) pairs
+    """
+    if not segments:
+        yield path, data
+        return
+    if not isinstance(data, dict):
+        return
+
+    segment, rest = segments[0], segments[1:]
+    keys = data if segment.key is None else (
+        (segment.key,) if segment.key in data else ()
+    )
+    for key in keys:
+        if segment.matches_value(data[key]):
+            yield from select(data[key], rest, path + (key,))
+
+
+def _skip_whitespace(text: str, index: int) -> int:
+    return _WHITESPACE.match(text, index).end()
+
+
+def _skip_value(text: str, index: int) -> int:
+    """
+    Get the end of the JSON value starting at the index without decoding it
+    """
+    char = text[index]
+    if char == '"':
+        return scanstring(text, index + 1)[1]
+    if char not in "{[":
+        return _DECODER.raw_decode(text, index)[1]
+
+    depth = 0
+    while True:
+        index = _PLAIN.match(text, index).end()
+        if index == len(text):
+            raise ValueError("Unterminated JSON value")
+        depth += 1 if text[index] in "{[" else -1
+        index += 1
+        if depth == 0:
+            return index
+
+
+def scan(text: str,
+         segments: tuple,
+         path: tuple = (),
+         keys: list = None) -> dict:
+    """
+    Evaluate segments on a JSON document
+    Only the matched values, and the values predicates need,
+    are decoded. Other branches are skipped over in the text.
+    :param text: the JSON document
+    :param segments: the compiled selector
+    :param path: the path of the document
+    :param keys: a list to collect the keys on the first level into
+    :return: the paths of the matched values joined with "/"
+        mapped to the values
+    """
+    results = {}
+    _scan_value(text, _skip_whitespace(text, 0), segments, path,
+                results, keys)
+    return results
+
+
+def _scan_value(text: str,
+                index: int,
+                segments: tuple,
+                path: tuple,
+                results: dict,
+                keys: list = None) -> int:
+    """
+    Evaluate segments on the value starting at the index
+    :return: the end of the value
+    """
+    if not segments:
+        value, end = _DECODER.raw_decode(text, index)
+        results["/".join(path)] = value
+        return end
+    if text[index] != "{":
+        return _skip_value(text, index)
+
+    segment, rest = segments[0], segments[1:]
+    index = _skip_whitespace(text, index + 1)
+    if text[index] == "}":
+        return index + 1
+
+    while True:
+        key, index = scanstring(text, index + 1)
+        index = _skip_whitespace(text, index)
+        index = _skip_whitespace(text, index + 1)  # the colon
+        if keys is not None:
+            keys.append(key)
+
+        if not segment.matches_key(key):
+            index = _skip_value(text, index)
+        elif segment.predicates:
+            value, index = _DECODER.raw_decode(text, index)
+            if segment.matches_value(value):
+                for match_path, match in select(value, rest, path + (key,)):
+                    results["/".join(match_path)] = match
+        else:
+            index = _scan_value(text, index, rest, path + (key,), results)
+
+        index = _skip_whitespace(text, index)
+        if text[index] == "}":
+            return index + 1
+        index = _skip_whitespace(text, index + 1)  # the comma
+
+
+class QueryEngine:
+    """
+    Evaluate selectors against a Cumulus host
+    A selector is answered with a single GET of its longest literal prefix.
+    The keys found under the first wildcard are remembered per revision.
+    A caller that accepts keys up to `key_ttl` seconds old can let a
+    selector continuing with literal segments after the wildcard be
+    answered with concurrent GETs of just those subtrees instead,
+    as long as there are no more keys than `max_workers`. Objects created
+    since the keys were read are then missing from the results.
+    :param client: the `Cumulus` client
+    :param int max_workers: the maximum number of concurrent GETs,
+        and of known keys to fan out over
+    :param float key_ttl: the default number of seconds known keys
+        are used for, 0 to never use them
+    """
+    STRATEGIES = ("auto", "parent")
+
+    def __init__(self,
+                 client,
+                 max_workers: int = 10,
+                 key_ttl: float = 0) -> None:
+        self.client = client
+        self.max_workers = max_workers
+        self.key_ttl = key_ttl
+
+        # (collection path, revision) -> (time, keys)
+        self._keys = {}
+
+    def _url(self, path: tuple) -> str:
+        return "{}/{}".format(
+            self.client.url, "/".join(url_safe(key) for key in path)
+        )
+
+    def _get(self, path: tuple, segments: tuple, params: dict,
+             keys: list = None) -> dict:
+        text = Request(
+            url=self._url(path),
+            http_session=self.client.http_session,
+            profiler=self.client.profiler
+        ).get_text(params=params)
+        return scan(text, segments, path, keys)
+
+    def _known_keys(self, path: tuple, rev: str, key_ttl: float) -> list:
+        known = self._keys.get((path, rev))
+        if known and time.monotonic() - known[0] < key_ttl:
+            return known[1]
+        return None
+
+    def run(self,
+            selector: str,
+            rev: str = None,
+            strategy: str = "auto",
+            key_ttl: float = None):
+        """
+        Evaluate a selector
+        :param selector: the selector, see the module documentation
+        :param rev: the revision to read, defaults to the applied one
+        :param strategy: "auto" to let the engine choose between one GET
+            and concurrent GETs, or "parent" to always make one GET
+        :param key_ttl: the number of seconds known keys are used for,
+            defaults to `key_ttl` of the engine
+        :return: the paths of the matched values mapped to the values
+        :raises ValueError: if the selector or the strategy is invalid
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown query strategy {strategy!r}")
+        if key_ttl is None:
+            key_ttl = self.key_ttl
+
+        segments = compile_selector(selector)
+        params = {"rev": rev} if rev else {}
+
+        position = 0
+        while position < len(segments) and segments[position].literal:
+            position += 1
+        prefix = tuple(segment.key for segment in segments[:position])
+        segments = segments[position:]
+        if not segments:
+            return self._get(prefix, segments, params)
+
+        wildcard, rest = segments[0], segments[1:]
+        literal = 0
+        while literal < len(rest) and rest[literal].literal:
+            literal += 1
+
+        if (strategy == "auto" and literal and key_ttl > 0
+                and wildcard.key is None and not wildcard.predicates):
+            # one round of concurrent GETs of small subtrees beats
+            # the GET of the whole collection, more rounds do not
+            keys = self._known_keys(prefix, rev, key_ttl)
+            if keys is not None and len(keys) <= self.max_workers:
+                return self._fan_out(prefix, keys, rest, literal, params)
+
+        keys = []
+        results = self._get(prefix, segments, params, keys)
+        if wildcard.key is None:
+            self._keys[(prefix, rev)] = (time.monotonic(), keys)
+        return results
+
+    def _fan_out(self, prefix: tuple, keys: list, rest: tuple,
+                 literal: int, params: dict) -> dict:
+        """
+        Get the literal part after the wildcard for every known key
+        """
+        suffix = tuple(segment.key for segment in rest[:literal])
+
+        def get(key):
+            try:
+                return self._get(prefix + (key,) + suffix,
+                                 rest[literal:], params)
+            except RequestError as error:
+                if error.response.status_code == 404:
+                    return {}
+                raise
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for matches in executor.map(get, keys):
+                results.update(matches)
+        return results
@@ -0,0 +1,268 @@
+import ipaddress
+from array import array
+from bisect import bisect_left, bisect_right
+
+_LOW_BITS = (1 << 64) - 1
+
+
+def _split(network: int) -> tuple:
+    """
+    Split a network address into its high and low 64 bits
+    """
+    return network >> 64, network & _LOW_BITS
+
+
+def _best_entry(route: dict) -> tuple:
+    """
+    Get the protocol and the next hops of the route entry in use
+    The entry flagged as selected is preferred, otherwise the first one.
+    """
+    best = None
+    for protocol, details in (route.get("protocol") or {}).items():
+        for entry in (details.get("entry-index") or {}).values():
+            candidate = (protocol, tuple(sorted(entry.get("via") or {})))
+            if "selected" in (entry.get("flags") or {}):
+                return candidate
+            if best is None:
+                best = candidate
+    return best or ("", ())
+
+
+class RibTable:
+    """
+    A compact snapshot of a routing table
+    Routes are kept in packed columns (network, prefix length,
+    next hop group id and protocol id) instead of nested dictionaries,
+    and identical next hop groups are stored once.
+    An index sorted per prefix length gives longest-prefix-match
+    lookups with a binary search per distinct prefix length.
+    :param str afi: the address family, "ipv4" or "ipv6"
+
+    >>> rib = api.vrf.rib("default")
+    >>> len(rib)
+    812345
+    >>> rib.lookup("10.1.2.3")
+    {'prefix': '10.1.0.0/16', 'protocol': 'bgp',
+     'nexthops': ('169.254.0.1',)}
+    """
+
+    def __init__(self, afi: str = "ipv4") -> None:
+        if afi not in ("ipv4", "ipv6"):
+            raise ValueError(f"Unknown address family {afi}")
+        self.afi = afi
+        self._network_class = (
+            ipaddress.IPv4Network if afi == "ipv4" else ipaddress.IPv6Network
+        )
+        self._address_class = (
+            ipaddress.IPv4Address if afi == "ipv4" else ipaddress.IPv6Address
+        )
+        self._max_length = 32 if afi == "ipv4" else 128
+
+        self._high = array("Q")
+        self._low = array("Q")
+        self._lengths = array("B")
+        self._nexthop_ids = array("I")
+        self._protocol_ids = array("B")
+
+        # interned next hop groups and protocols
+        self._nexthops = []
+        self._nexthop_index = {}
+        self._protocols = []
+        self._protocol_index = {}
+
+        # prefix length -> (high bits, low bits, rows) sorted by network
+        self._index = None
+
+    @classmethod
+    def from_routes(cls, routes: dict, afi: str = "ipv4") -> "RibTable":
+        """
+        Build a table from the routes returned by the API
+        :param routes: the content of `vrf/<name>/router/rib/<afi>/route`
+        :param afi: the address family of the routes
+        """
+        table = cls(afi)
+        for prefix, route in routes.items():
+            protocol, nexthops = _best_entry(route or {})
+            table.add(prefix, nexthops, protocol)
+        return table
+
+    @staticmethod
+    def _intern(value, values: list, index: dict) -> int:
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = index[value] = len(values)
+            values.append(value)
+        return value_id
+
+    def add(self, prefix: str, nexthops: tuple, protocol: str = "") -> None:
+        """
+        Add a route to the table
+        :param prefix: the destination, e.g. "10.0.0.0/24"
+        :param nexthops: the next hops of the route
+        :param protocol: the protocol the route comes from
+        """
+        network, length = self._parse(prefix)
+        high, low = _split(network)
+
+        self._high.append(high)
+        self._low.append(low)
+        self._lengths.append(length)
+        self._nexthop_ids.append(self._intern(
+            tuple(nexthops), self._nexthops, self._nexthop_index
+        ))
+        self._protocol_ids.append(self._intern(
+            protocol, self._protocols, self._protocol_index
+        ))
+        self._index = None
+
+    def _parse(self, prefix: str) -> tuple:
+        """
+        Get the network address and the prefix length of the prefix
+        IPv4 prefixes are parsed by hand, which is several times faster
+        than `ipaddress` on full tables.
+        """
+        if self.afi == "ipv4":
+            address, _, length = prefix.partition("/")
+            octets = address.split(".")
+            length = int(length) if length else 32
+            if len(octets) == 4 and 0 <= length <= 32:
+                network = 0
+                for octet in octets:
+                    octet = int(octet)
+                    if not 0 <= octet <= 255:
+                        break
+                    network = network << 8 | octet
+                else:
+                    mask = ((1 << length) - 1) << (32 - length)
+                    return network & mask, length
+
+        network = self._network_class(prefix, strict=False)
+        return int(network.network_address), network.prefixlen
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.route(row)
+
+    def _prefix(self, row: int) -> str:
+        network = (self._high[row] << 64) | self._low[row]
+        return self._network_class(
+            (network, self._lengths[row])
+        ).with_prefixlen
+
+    def route(self, row: int) -> dict:
+        """
+        Get the route stored in a row of the table
+        """
+        return {
+            "prefix": self._prefix(row),
+            "protocol": self._protocols[self._protocol_ids[row]],
+            "nexthops": self._nexthops[self._nexthop_ids[row]],
+        }
+
+    def _entry(self, row: int) -> tuple:
+        """
+        Get the protocol and the next hops of a row
+        """
+        return (self._protocols[self._protocol_ids[row]],
+                self._nexthops[self._nexthop_ids[row]])
+
+    def _build_index(self) -> dict:
+        """
+        Sort the rows of each prefix length by network
+        """
+        rows_by_length = {}
+        for row, length in enumerate(self._lengths):
+            rows_by_length.setdefault(length, []).append(row)
+
+        index = {}
+        for length in sorted(rows_by_length, reverse=True):
+            rows = sorted(
+                rows_by_length[length],
+                key=lambda row: (self._high[row], self._low[row])
+            )
+            index[length] = (
+                array("Q", (self._high[row] for row in rows)),
+                array("Q", (self._low[row] for row in rows)),
+                array("I", rows),
+            )
+        return index
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    @staticmethod
+    def _find(entries: tuple, high: int, low: int) -> int:
+        """
+        Get the row of the network in a prefix length index or -1
+        """
+        highs, lows, rows = entries
+        start = bisect_left(highs, high)
+        end = bisect_right(highs, high, start)
+        position = bisect_left(lows, low, start, end)
+        if position < end and lows[position] == low:
+            return rows[position]
+        return -1
+
+    def lookup(self, address: str) -> dict:
+        """
+        Get the longest prefix match of the address
+        :param address: the destination address, e.g. "10.1.2.3"
+        :return: the matching route or None
+        """
+        address = int(self._address_class(address))
+        for length, entries in self.index.items():
+            mask = ((1 << length) - 1) << (self._max_length - length)
+            high, low = _split(address & mask)
+            row = self._find(entries, high, low)
+            if row >= 0:
+                return self.route(row)
+        return None
+
+    def diff(self, other: "RibTable") -> dict:
+        """
+        Compare the table with a newer snapshot
+        Both indexes are walked in network order, so the comparison is
+        linear in the number of routes.
+        :param other: the newer snapshot
+        :return: prefixes mapped to their routes for added and removed
+            routes, and to (old route, new route) for changed ones
+
+        >>> before.diff(after)
+        {'added': {'10.9.0.0/16': {...}}, 'removed': {},
+         'changed': {'10.1.0.0/16': ({...}, {...})}}
+        """
+        added, removed, changed = {}, {}, {}
+
+        for length in set(self.index) | set(other.index):
+            old = self.index.get(length, ((), (), ()))
+            new = other.index.get(length, ((), (), ()))
+            i = j = 0
+            while i < len(old[2]) or j < len(new[2]):
+                old_key = (old[0][i], old[1][i]) if i < len(old[2]) else None
+                new_key = (new[0][j], new[1][j]) if j < len(new[2]) else None
+                if new_key is None or (old_key is not None
+                                       and old_key < new_key):
+                    route = self.route(old[2][i])
+                    removed[route["prefix"]] = route
+                    i += 1
+                elif old_key is None or new_key < old_key:
+                    route = other.route(new[2][j])
+                    added[route["prefix"]] = route
+                    j += 1
+                else:
+                    old_row, new_row = old[2][i], new[2][j]
+                    if self._entry(old_row) != other._entry(new_row):
+                        old_route = self.route(old_row)
+                        changed[old_route["prefix"]] = (
+                            old_route, other.route(new_row)
+                        )
+                    i += 1
+                    j += 1
+
+        return {"added": added, "removed": removed, "changed": changed}
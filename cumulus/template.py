@@ -0,0 +1,191 @@
+from itertools import count
+
+
+def _prune(data):
+    """
+    Drop keys set to None from the data
+    The data is returned as is when there is nothing to drop.
+    """
+    if not isinstance(data, dict):
+        return data
+
+    pruned = None
+    for key, value in data.items():
+        new_value = _prune(value)
+        if new_value is not value or value is None:
+            if pruned is None:
+                pruned = dict(data)
+            if value is None:
+                del pruned[key]
+            else:
+                pruned[key] = new_value
+
+    return data if pruned is None else pruned
+
+
+def merge(base: dict, overlay: dict) -> dict:
+    """
+    Deep-merge the overlay on top of the base
+    Neither argument is modified. Subtrees that the overlay does not touch
+    are shared with the base instead of being copied, so the result
+    must be treated as read-only.
+    A key set to None in the overlay removes the key from the result.
+    :param base: the configuration to merge onto
+    :param overlay: the configuration taking precedence
+
+    >>> merge({"system": {"hostname": "leaf", "timezone": "Etc/UTC"}},
+              {"system": {"hostname": "leaf01"}})
+    {'system': {'hostname': 'leaf01', 'timezone': 'Etc/UTC'}}
+    """
+    if not overlay:
+        return base
+
+    merged = dict(base)
+    for key, value in overlay.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = _prune(value)
+
+    return merged
+
+
+class ConfigTemplate:
+    """
+    Render switch configurations from shared layers and host overrides
+    Each host is rendered by merging its layers in order,
+    e.g. a site base and a role, and then its own overrides.
+    Merged layers are memoized, so hosts with the same layers share
+    a single merged tree and only the host overrides are merged per host.
+    Layers and overrides are stored as given and must not be modified
+    after they are set; use `set_layer` or `set_host` again instead.
+
+    >>> template = ConfigTemplate()
+    >>> template.set_layer("site", site_config)
+    >>> template.set_layer("leaf", leaf_config)
+    >>> template.set_host("leaf01", ["site", "leaf"],
+                          {"system": {"hostname": "leaf01"}})
+    >>> template.render("leaf01")
+    {'system': {'hostname': 'leaf01', ...}, ...}
+    """
+
+    def __init__(self) -> None:
+        self._versions = count(1)
+
+        # layer name -> (version, data)
+        self._layers = {}
+        # host -> (layer names, version, overrides)
+        self._hosts = {}
+        # ((layer name, version), ...) -> merged layers
+        self._merged = {}
+        # host -> (fingerprint, rendered configuration)
+        self._rendered = {}
+
+    def set_layer(self, name: str, data: dict) -> None:
+        """
+        Add or replace a layer shared between hosts
+        :param name: the name of the layer, e.g. "site" or "leaf"
+        :param data: the configuration of the layer
+        """
+        self._layers[name] = (next(self._versions), data)
+        self._merged = {
+            key: merged for key, merged in self._merged.items()
+            if all(layer != name for layer, _ in key)
+        }
+
+    def set_host(self,
+                 host: str,
+                 layers: list,
+                 overrides: dict = None) -> None:
+        """
+        Add or replace a host
+        :param host: the name of the host
+        :param layers: the names of the layers to merge in order,
+            later layers take precedence
+        :param overrides: the host configuration merged on top of the layers
+        """
+        self._hosts[host] = (
+            tuple(layers), next(self._versions), overrides or {}
+        )
+
+    def remove_host(self, host: str) -> None:
+        """
+        Remove a host and its rendered configuration
+        :param host: the name of the host
+        """
+        self._hosts.pop(host)
+        self._rendered.pop(host, None)
+
+    def _fingerprint(self, host: str) -> tuple:
+        """
+        Identify the inputs of the host rendering
+        """
+        layers, version, _ = self._hosts[host]
+        return (
+            tuple((name, self._layers[name][0]) for name in layers),
+            version
+        )
+
+    def _merge_layers(self, key: tuple) -> dict:
+        """
+        Get the memoized merge of the layers
+        :param key: the (layer name, version) pairs to merge in order
+        """
+        if not key:
+            return {}
+        if key not in self._merged:
+            name, _ = key[-1]
+            self._merged[key] = merge(
+                self._merge_layers(key[:-1]), self._layers[name][1]
+            )
+        return self._merged[key]
+
+    def render(self, host: str) -> dict:
+        """
+        Render the configuration of the host
+        The rendering is reused until the inputs of the host change.
+        The result shares subtrees with other hosts and must be
+        treated as read-only.
+        :param host: the name of the host
+        """
+        fingerprint = self._fingerprint(host)
+        rendered = self._rendered.get(host)
+        if rendered and rendered[0] == fingerprint:
+            return rendered[1]
+
+        layers, overrides = fingerprint[0], self._hosts[host][2]
+        config = merge(self._merge_layers(layers), overrides)
+        self._rendered[host] = (fingerprint, config)
+
+        return config
+
+    def changed(self) -> list:
+        """
+        Get the hosts whose inputs changed since they were last rendered
+        """
+        return [
+            host for host in self._hosts
+            if host not in self._rendered
+            or self._rendered[host][0] != self._fingerprint(host)
+        ]
+
+    def render_changed(self) -> dict:
+        """
+        Render only the hosts whose inputs changed since the last rendering
+        :return: host names mapped to their new configuration
+        """
+        return {host: self.render(host) for host in self.changed()}
+
+    def patch(self, root, rev: str, host: str):
+        """
+        Patch the rendered configuration of the host
+        :param root: the `Root` model of the host client
+        :param rev: the revision on which to update configuration
+        :param host: the name of the host
+
+        >>> nv.revision.create()
+        >>> template.patch(nv.root, nv.revision.rev, "leaf01")
+        """
+        return root.patch(rev=rev, data=self.render(host))
@@ -0,0 +1,239 @@
+"""
+Lightweight alternatives to `requests.Session`
+
+A Cumulus client only needs a small part of a session: the `auth` and
+`verify` attributes and a `request` method returning a response object.
+The sessions in this module provide exactly that on top of a bare HTTP
+client, which avoids the per-call overhead of the `requests` stack
+(settings merging, hooks, adapters) on small requests.
+
+>>> from cumulus.transport import Urllib3Session
+>>> nv = Cumulus(url="https://127.0.0.1:8765",
+                 auth=("cumulus", "password"),
+                 http_session=Urllib3Session())
+"""
+import time
+import urllib3
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from json import dumps, loads
+from urllib.parse import urlencode
+
+
+class TransportRequest:
+    """
+    The part of the sent request kept on the response
+    """
+
+    def __init__(self, method: str, url: str, body: bytes) -> None:
+        self.method = method
+        self.url = url
+        self.body = body
+
+
+class TransportResponse:
+    """
+    A response exposing the same attributes as `requests.Response`
+    that the client relies on
+    """
+
+    def __init__(self,
+                 request: TransportRequest,
+                 status_code: int,
+                 reason: str,
+                 headers: dict,
+                 content: bytes,
+                 elapsed: timedelta) -> None:
+        self.request = request
+        self.url = request.url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return loads(self.content)
+
+
+class BaseSession(ABC):
+    """
+    The base that each transport session shares
+    Subclasses send the request in `_send`.
+    :param float timeout: the number of seconds to wait for the server,
+        waits forever by default like `requests`
+    """
+
+    def __init__(self, timeout: float = None) -> None:
+        self.timeout = timeout
+        self.auth = None
+        self.verify = True
+        self.headers = {}
+
+    @abstractmethod
+    def _send(self,
+              method: str,
+              url: str,
+              body: bytes,
+              headers: dict) -> TransportResponse:
+        """
+        Send the encoded request over the HTTP client
+        """
+
+    def request(self,
+                method: str,
+                url: str,
+                json: dict = None,
+                data: bytes = None,
+                params: dict = None,
+                headers: dict = None) -> TransportResponse:
+        """
+        Send a request
+        Arguments follow `requests.Session.request`.
+        """
+        if params:
+            url = "{}?{}".format(url, urlencode(params))
+
+        body = data
+        if body is None and json is not None:
+            body = dumps(json).encode("utf-8")
+
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+
+        return self._send(method.upper(), url, body, request_headers)
+
+    def close(self) -> None:
+        """
+        Close all pooled connections
+        """
+
+
+class Urllib3Session(BaseSession):
+    """
+    A session on top of a urllib3 connection pool
+    `urllib3` is already installed as a dependency of `requests`.
+    :param int maxsize: the number of connections kept per host
+    :param float timeout: the number of seconds to wait for the server
+    """
+
+    def __init__(self, maxsize: int = 10, timeout: float = None) -> None:
+        super().__init__(timeout)
+        self.maxsize = maxsize
+
+        # pools are created on the first request
+        # since `verify` can be changed after the session is created
+        self._pools = {}
+
+    def _pool(self):
+        verify = self.verify
+        if verify not in self._pools:
+            options = {"maxsize": self.maxsize}
+            if verify is False:
+                options["cert_reqs"] = "CERT_NONE"
+            else:
+                options["cert_reqs"] = "CERT_REQUIRED"
+                if isinstance(verify, str):
+                    options["ca_certs"] = verify
+            self._pools[verify] = urllib3.PoolManager(**options)
+        return self._pools[verify]
+
+    def _send(self, method, url, body, headers):
+        if self.auth:
+            headers.update(urllib3.make_headers(
+                basic_auth="{}:{}".format(*self.auth)
+            ))
+
+        start = time.perf_counter()
+        response = self._pool().urlopen(
+            method, url,
+            body=body,
+            headers=headers,
+            retries=False,
+            redirect=False,
+            timeout=self.timeout,
+            preload_content=False
+        )
+        elapsed = timedelta(seconds=time.perf_counter() - start)
+        try:
+            content = response.read()
+        finally:
+            response.release_conn()
+
+        return TransportResponse(
+            request=TransportRequest(method, url, body),
+            status_code=response.status,
+            reason=response.reason,
+            headers=response.headers,
+            content=content,
+            elapsed=elapsed
+        )
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.clear()
+        self._pools = {}
+
+
+class HTTP2Session(BaseSession):
+    """
+    A session on top of an HTTP/2 capable `httpx` client
+    Concurrent requests to the same switch are multiplexed
+    over a single connection when the switch negotiates HTTP/2.
+    Requires the `http2` extra: pip install "py-nvidia-cumulus[http2]"
+    :param float timeout: the number of seconds to wait for the server
+    """
+
+    def __init__(self, timeout: float = None) -> None:
+        try:
+            import httpx  # noqa: F401
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                'HTTP2Session requires httpx and h2: '
+                'pip install "py-nvidia-cumulus[http2]"'
+            )
+        super().__init__(timeout)
+
+        self._clients = {}
+
+    def _client(self):
+        import httpx
+
+        verify = self.verify
+        if verify not in self._clients:
+            self._clients[verify] = httpx.Client(
+                http2=True, verify=verify, timeout=self.timeout
+            )
+        return self._clients[verify]
+
+    def _send(self, method, url, body, headers):
+        response = self._client().request(
+            method, url,
+            content=body,
+            headers=headers,
+            auth=self.auth
+        )
+
+        return TransportResponse(
+            request=TransportRequest(method, url, body),
+            status_code=response.status_code,
+            reason=response.reason_phrase,
+            headers=response.headers,
+            content=response.content,
+            elapsed=response.elapsed
+        )
+
+    def close(self):
+        for client in self._clients.values():
+            client.close()
+        self._clients = {}
@@ -0,0 +1,161 @@
+import time
+import unittest
+from unittest.mock import Mock
+from cumulus.acl import AclBuilder
+from cumulus.base import RequestError
+
+SSH = {"ip": {"protocol": "tcp", "dest-port": {"22": {}}}}
+WEB = {"ip": {"protocol": "tcp", "dest-port": {"80": {}, "443": {}}}}
+PERMIT = {"permit": {}}
+DENY = {"deny": {}}
+
+APPLIED = {
+    "type": "ipv4",
+    "rule": {
+        "10": {"match": SSH, "action": PERMIT},
+        "20": {"match": WEB, "action": PERMIT},
+        "30": {"match": {"ip": {"protocol": "udp"}}, "action": PERMIT,
+               "remark": "dns"},
+        "100": {"match": {}, "action": DENY},
+    }
+}
+
+
+class TestAclBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.acl = AclBuilder.from_config("EDGE_IN", APPLIED)
+
+    def test_order(self):
+        self.acl.add(15, {"ip": {"protocol": "icmp"}}, PERMIT)
+        self.assertEqual(list(self.acl.rules), ["10", "15", "20", "30", "100"])
+        self.acl.remove("15")
+        self.assertEqual(self.acl.to_config(), APPLIED)
+
+    def test_plan_unchanged(self):
+        self.assertEqual(self.acl.plan(APPLIED), {
+            "added": [], "removed": [], "changed": [], "moved": [],
+            "delete": [], "patch": {}
+        })
+
+    def test_plan(self):
+        self.acl.add(10, {"ip": {"protocol": "tcp",
+                                 "dest-port": {"2222": {}}}}, PERMIT)
+        self.acl.remove(20)
+        self.acl.set_rule(25, APPLIED["rule"]["20"])
+        self.acl.set_rule(30, {"match": {"ip": {"protocol": "udp"}},
+                               "action": PERMIT})
+
+        plan = self.acl.plan(APPLIED)
+        self.assertEqual(plan["added"], ["25"])
+        self.assertEqual(plan["removed"], ["20"])
+        self.assertEqual(plan["changed"], ["10", "30"])
+        self.assertEqual(plan["moved"], [("20", "25")])
+        # only the parts rules 10 and 30 lose are deleted
+        self.assertEqual(plan["delete"], [
+            "EDGE_IN/rule/20",
+            "EDGE_IN/rule/10/match/ip/dest-port/22",
+            "EDGE_IN/rule/30/remark",
+        ])
+        self.assertEqual(plan["patch"], {"rule": {
+            "25": APPLIED["rule"]["20"],
+            "10": {"match": {"ip": {"dest-port": {"2222": {}}}}},
+        }})
+
+    def test_plan_moved_key_order(self):
+        self.acl.remove(20)
+        self.acl.set_rule(25, {"action": PERMIT, "match": WEB})
+
+        self.assertEqual(self.acl.plan(APPLIED)["moved"], [("20", "25")])
+
+    def test_plan_update(self):
+        self.acl.add(20, {"ip": {"protocol": "tcp",
+                                 "dest-port": {"80": {}, "443": {}},
+                                 "source-ip": "10.0.0.0/8"}}, PERMIT)
+
+        plan = self.acl.plan(APPLIED)
+        self.assertEqual(plan["delete"], [])
+        self.assertEqual(plan["patch"], {"rule": {
+            "20": {"match": {"ip": {"source-ip": "10.0.0.0/8"}}}
+        }})
+
+    def test_plan_new_acl(self):
+        plan = self.acl.plan({})
+        self.assertEqual(plan["added"], ["10", "20", "30", "100"])
+        self.assertEqual(plan["patch"], APPLIED)
+
+    def test_check(self):
+        self.acl.add(40, SSH, DENY)
+        self.acl.add(50, {"ip": {"protocol": "tcp"}}, PERMIT)
+        self.acl.add(60, {"ip": {"protocol": "tcp",
+                                 "dest-port": {"80": {}}}}, DENY)
+        self.acl.add(70, {"ip": {"protocol": "udp",
+                                 "dest-port": {"53": {}}}}, PERMIT)
+        self.acl.add(80, {"ip": {"protocol": "icmp"}}, PERMIT)
+
+        self.assertEqual(self.acl.check(), {
+            "duplicates": {"40": "10"},
+            "shadowed": {"60": "20", "70": "30"},
+        })
+
+    def test_check_port_sets(self):
+        acl = AclBuilder("EDGE_IN")
+        acl.add(10, WEB, PERMIT)
+        acl.add(20, {"ip": {"dest-port": {"443": {}, "80": {}},
+                            "protocol": "tcp"}}, DENY)
+        acl.add(30, {"ip": {"protocol": "tcp",
+                            "dest-port": {"443": {}}}}, DENY)
+        acl.add(40, {"ip": {"protocol": "tcp",
+                            "dest-port": {"443": {}, "8443": {}}}}, DENY)
+        acl.add(50, {"ip": {"protocol": "tcp",
+                            "dest-port": {"8443": {}},
+                            "source-ip": "10.0.0.0/8"}}, DENY)
+
+        self.assertEqual(acl.check(), {
+            "duplicates": {"20": "10"},
+            "shadowed": {"30": "10", "50": "40"},
+        })
+
+    def test_check_scale(self):
+        # rules sharing their conditions except the port are the usual
+        # shape of large ACLs, comparing them pairwise takes over a minute
+        acl = AclBuilder("EDGE_IN")
+        for rule_id in range(1, 10001):
+            acl.add(rule_id, {"ip": {"protocol": "tcp",
+                                     "source-ip": "10.0.0.0/8",
+                                     "dest-port": {str(rule_id): {}}}},
+                    PERMIT)
+        acl.add(10001, {"ip": {"protocol": "tcp",
+                               "source-ip": "10.0.0.0/8",
+                               "dest-port": {"5000": {}}}}, DENY)
+
+        start = time.perf_counter()
+        result = acl.check()
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(result, {"duplicates": {"10001": "5000"},
+                                  "shadowed": {}})
+
+    def test_patch(self):
+        client = Mock()
+        client.acl.get.side_effect = RequestError(Mock(status_code=404))
+
+        plan = self.acl.patch(client, "1")
+        client.acl.get.assert_called_once_with(
+            "EDGE_IN", endpoint_params={"rev": "applied", "filled": False}
+        )
+        self.assertEqual(plan["added"], ["10", "20", "30", "100"])
+        client.acl.delete.assert_not_called()
+        client.acl.patch.assert_called_once_with(
+            rev="1", data=APPLIED, target_path="EDGE_IN"
+        )
+
+    def test_patch_applied(self):
+        client = Mock()
+        self.acl.remove(30)
+
+        self.acl.patch(client, "1", applied=APPLIED)
+        client.acl.get.assert_not_called()
+        client.acl.delete.assert_called_once_with(
+            "1", target_path="EDGE_IN/rule/30"
+        )
+        client.acl.patch.assert_not_called()
@@ -141,3 +141,18 @@ class TestRequest(unittest.TestCase):
             method="delete",
             params={},
         )
+
+    @patch(
+        'requests.Session.request',
+        return_value=MockRequest(text='{"key": "value"}')
+    )
+    def test_get_text(self, request: Mock):
+        text = self.request.get_text()
+        self.assertEqual(text, '{"key": "value"}')
+        request.assert_called_once_with(
+            method="get",
+            url=self.request.url,
+            json={},
+            params={},
+            headers=self.headers
+        )
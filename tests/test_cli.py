@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch, Mock
+from cumulus import cli
+
+TEST_INVENTORY = {
+    "hosts": {
+        "leaf01": {"url": "https://localhost:8765"},
+        "leaf02": {"url": "https://localhost:8766"},
+    }
+}
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json",
+                                         delete=False) as inventory_file:
+            json.dump(TEST_INVENTORY, inventory_file)
+        self.addCleanup(os.remove, inventory_file.name)
+        self.inventory = inventory_file.name
+
+    def run_cli(self, *argv, credentials=("-u", "cumulus",
+                                          "-p", "something")):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            code = cli.main(["-i", self.inventory, *credentials, *argv])
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        return code, sorted(lines, key=lambda line: line["host"])
+
+    @patch(
+        'cumulus.base.Request.get',
+        return_value={"hostname": "leaf"}
+    )
+    def test_health(self, get: Mock):
+        code, lines = self.run_cli("health")
+        self.assertEqual(code, 0)
+        self.assertEqual(lines, [
+            {"host": "leaf01", "result": {"hostname": "leaf"}},
+            {"host": "leaf02", "result": {"hostname": "leaf"}},
+        ])
+
+    @patch(
+        'cumulus.models.BaseModel.get',
+        return_value={"127.0.0.1/8": {}}
+    )
+    def test_get_limit(self, get: Mock):
+        code, lines = self.run_cli("-l", "leaf02", "get",
+                                   "interface/lo/ip/address", "--rev", "2")
+        self.assertEqual(code, 0)
+        self.assertEqual(lines, [
+            {"host": "leaf02", "result": {"127.0.0.1/8": {}}},
+        ])
+        get.assert_called_once_with("interface/lo/ip/address",
+                                    endpoint_params={"rev": "2"})
+
+    @patch(
+        'cumulus.models.Revision.is_applied',
+        return_value=False
+    )
+    @patch(
+        'cumulus.models.Revision.apply',
+        return_value=dict()
+    )
+    @patch(
+        'cumulus.models.BaseModel.patch',
+        return_value=dict()
+    )
+    @patch(
+        'cumulus.base.Request.post',
+        return_value={"1": {"state": "pending"}}
+    )
+    def test_apply_failure(self, *_):
+        with tempfile.NamedTemporaryFile("w", suffix=".json",
+                                         delete=False) as data_file:
+            json.dump({"system": {"hostname": "leaf"}}, data_file)
+        self.addCleanup(os.remove, data_file.name)
+
+        code, lines = self.run_cli("-l", "leaf01", "apply", data_file.name)
+        self.assertEqual(code, 1)
+        self.assertEqual(lines[0]["host"], "leaf01")
+        self.assertIn("Revision 1 was not applied", lines[0]["error"])
+
+    def test_unknown_host(self):
+        with redirect_stdout(io.StringIO()), \
+                patch('sys.stderr', io.StringIO()):
+            with self.assertRaises(SystemExit):
+                self.run_cli("-l", "spine01", "health")
+
+    @patch.dict('os.environ', {}, clear=True)
+    def test_missing_credentials(self):
+        stderr = io.StringIO()
+        with redirect_stdout(io.StringIO()), patch('sys.stderr', stderr):
+            with self.assertRaises(SystemExit):
+                self.run_cli("-l", "leaf01", "health",
+                             credentials=("-u", "cumulus"))
+        self.assertIn("no credentials for hosts: leaf01", stderr.getvalue())
+
+    def test_invalid_concurrency(self):
+        for concurrency in ("0", "-3", "many"):
+            stderr = io.StringIO()
+            with patch('sys.stderr', stderr):
+                with self.assertRaises(SystemExit):
+                    self.run_cli("-c", concurrency, "health")
+            self.assertIn("is not a positive integer", stderr.getvalue())
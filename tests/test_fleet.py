@@ -0,0 +1,159 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+from cumulus import Cumulus
+from cumulus.base import RequestError
+from cumulus.fleet import Fleet, load_inventory
+from cumulus.journal import Journal
+
+TEST_INVENTORY = {
+    "defaults": {"auth": ["cumulus", "something"], "verify": False},
+    "hosts": {
+        "leaf01": {"url": "https://localhost:8765"},
+        "leaf02": {"url": "https://localhost:8766",
+                   "auth": ["admin", "other"]},
+    }
+}
+
+
+class TestLoadInventory(unittest.TestCase):
+
+    def test_load_inventory(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json",
+                                         delete=False) as inventory_file:
+            json.dump(TEST_INVENTORY, inventory_file)
+        self.addCleanup(os.remove, inventory_file.name)
+
+        inventory = load_inventory(inventory_file.name)
+        self.assertEqual(inventory["leaf01"], {
+            "url": "https://localhost:8765",
+            "auth": ("cumulus", "something"),
+            "verify": False
+        })
+        self.assertEqual(inventory["leaf02"]["auth"], ("admin", "other"))
+
+
+class TestFleet(unittest.TestCase):
+
+    def setUp(self):
+        self.fleet = Fleet({
+            "leaf01": {"url": "https://localhost:8765",
+                       "auth": ("cumulus", "something")},
+            "leaf02": {"url": "https://localhost:8766",
+                       "auth": ("admin", "other"),
+                       "verify": False},
+        }, concurrency=2)
+
+    def test_client(self):
+        client = self.fleet.client("leaf02")
+        self.assertIsInstance(client, Cumulus)
+        self.assertIs(client, self.fleet.client("leaf02"))
+        self.assertEqual(client.http_session.auth, ("admin", "other"))
+        self.assertFalse(client.http_session.verify)
+        self.assertIsNot(client.http_session,
+                         self.fleet.client("leaf01").http_session)
+
+    @patch(
+        'cumulus.base.Request.get',
+        return_value={"hostname": "leaf"}
+    )
+    def test_run(self, get: Mock):
+        results = {
+            host: (result, error)
+            for host, result, error in self.fleet.run(
+                lambda nv, path: nv.root.get(path), "system"
+            )
+        }
+        self.assertEqual(results, {
+            "leaf01": ({"hostname": "leaf"}, None),
+            "leaf02": ({"hostname": "leaf"}, None),
+        })
+        self.assertEqual(get.call_count, 2)
+
+    def test_run_error(self):
+        error = Exception("failed")
+
+        def operation(nv):
+            raise error
+
+        results = list(self.fleet.run(operation, hosts=["leaf01"]))
+        self.assertEqual(results, [("leaf01", None, error)])
+
+    @patch(
+        'cumulus.models.Revision.is_applied',
+        return_value=True
+    )
+    @patch(
+        'cumulus.models.Revision.apply',
+        return_value=dict()
+    )
+    @patch(
+        'cumulus.models.BaseModel.patch',
+        return_value=dict()
+    )
+    @patch(
+        'cumulus.base.Request.post',
+        return_value={"1": {"state": "pending"}}
+    )
+    def test_apply_journal(self, post: Mock, patch: Mock, *_):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        journal = Journal(os.path.join(directory.name, "journal.jsonl"))
+
+        results = list(self.fleet.apply(lambda host: {"host": host},
+                                        journal=journal,
+                                        hosts=["leaf01"]))
+        self.assertEqual(results, [
+            ("leaf01", {"revision": "1", "resumed": False}, None)
+        ])
+        patch.assert_called_once_with(rev="1",
+                                      data={"host": "leaf01"},
+                                      target_path="")
+        self.assertEqual(journal.load()["leaf01"]["stage"],
+                         Journal.VERIFIED)
+
+        # verified hosts are skipped without any request
+        post.reset_mock()
+        results = list(self.fleet.apply(lambda host: {"host": host},
+                                        journal=journal, resume=True,
+                                        hosts=["leaf01"]))
+        self.assertEqual(results, [
+            ("leaf01",
+             {"revision": "1", "resumed": True, "skipped": True},
+             None)
+        ])
+        post.assert_not_called()
+
+        # an edited payload starts over
+        results = list(self.fleet.apply({"edited": True},
+                                        journal=journal, resume=True,
+                                        hosts=["leaf01"]))
+        self.assertEqual(results, [
+            ("leaf01", {"revision": "1", "resumed": False}, None)
+        ])
+        post.assert_called_once()
+        patch.assert_called_with(rev="1",
+                                 data={"edited": True},
+                                 target_path="")
+
+    def resume(self, entry: dict, revision: dict = None, error=None):
+        with patch('cumulus.models.BaseModel.get',
+                   return_value=revision, side_effect=error):
+            nv = self.fleet.client("leaf01")
+            return self.fleet._resume(nv, entry)
+
+    def test_resume(self):
+        entry = {"host": "leaf01", "stage": Journal.PATCHED, "rev": "3"}
+        self.assertEqual(self.resume(entry, {"state": "pending"}),
+                         Journal.PATCHED)
+        self.assertEqual(self.resume(entry, {"state": "apply"}),
+                         Journal.APPLIED)
+        self.assertEqual(self.resume(entry, {"state": "applied"}),
+                         Journal.VERIFIED)
+        self.assertIsNone(self.resume(entry, {"state": "apply_fail"}))
+        self.assertIsNone(self.resume(
+            entry, error=RequestError(Mock(status_code=404))
+        ))
+        self.assertEqual(self.fleet.client("leaf01").revision.rev, "3")
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from cumulus.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.journal = Journal(os.path.join(directory.name, "journal.jsonl"))
+
+    def test_load_missing(self):
+        self.assertEqual(self.journal.load(), {})
+
+    def test_record(self):
+        self.journal.record("leaf01", Journal.CREATED, rev="1")
+        self.journal.record("leaf02", Journal.CREATED, rev="7")
+        self.journal.record("leaf01", Journal.PATCHED, rev="1",
+                            payload="abc")
+
+        entries = self.journal.load()
+        self.assertEqual(entries["leaf01"]["stage"], Journal.PATCHED)
+        self.assertEqual(entries["leaf01"]["rev"], "1")
+        self.assertEqual(entries["leaf01"]["payload"], "abc")
+        self.assertEqual(entries["leaf02"]["stage"], Journal.CREATED)
+
+    def test_load_partial_line(self):
+        self.journal.record("leaf01", Journal.APPLIED, rev="1")
+        with open(self.journal.path, "a") as journal_file:
+            journal_file.write('{"host": "leaf01", "sta')
+
+        self.assertEqual(self.journal.load()["leaf01"]["stage"],
+                         Journal.APPLIED)
+
+        # the next entry starts on a new line
+        self.journal.record("leaf02", Journal.CREATED, rev="4")
+        entries = self.journal.load()
+        self.assertEqual(entries["leaf01"]["stage"], Journal.APPLIED)
+        self.assertEqual(entries["leaf02"]["rev"], "4")
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import patch, Mock
 from cumulus import Cumulus
@@ -182,3 +183,61 @@ class TestRoot(unittest.TestCase):
                 "filled": False
             }
         )
+
+
+class TestRevisionWatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.api = Cumulus(url=TEST_URL, auth=TEST_AUTH)
+        cls.revision = Revision(cls.api, endpoint="revision")
+        cls.revision.rev = "1"
+        cls.snapshots = [
+            {"state": "apply",
+             "transition": {"issue": {}, "progress": ""}},
+            {"state": "apply",
+             "transition": {"issue": {}, "progress": ""}},
+            {"state": "ays",
+             "transition": {"issue": {"0": {"message": "Are you sure?"}},
+                            "progress": ""}},
+            {"state": "apply",
+             "transition": {"issue": {"0": {"message": "Are you sure?"}},
+                            "progress": "Reloading"}},
+            {"state": "applied",
+             "transition": {"issue": {"0": {"message": "Are you sure?"}},
+                            "progress": "Reloading"}},
+        ]
+
+    @patch('cumulus.models.Revision.apply', return_value=dict())
+    def test_watch(self, apply: Mock):
+        with patch('cumulus.models.Revision.refresh',
+                   side_effect=self.snapshots):
+            events = list(self.revision.watch(min_interval=0,
+                                              max_interval=0))
+        self.assertEqual(
+            [(event["type"], event.get("state")) for event in events],
+            [("state", "apply"),
+             ("state", "ays"), ("issue", "ays"),
+             ("state", "apply"), ("progress", "apply"),
+             ("state", "applied")]
+        )
+        self.assertEqual(set(events[-1]["phases"]), {"apply", "ays"})
+        apply.assert_called_once()
+
+    def test_watch_timeout(self):
+        with patch('cumulus.models.Revision.refresh',
+                   return_value=self.snapshots[0]):
+            with self.assertRaises(TimeoutError):
+                list(self.revision.watch(timeout=0, min_interval=0))
+
+    def test_awatch(self):
+        async def collect():
+            return [event async for event in self.revision.awatch(
+                min_interval=0, max_interval=0
+            )]
+
+        with patch('cumulus.models.Revision.refresh',
+                   side_effect=self.snapshots[3:]):
+            events = asyncio.run(collect())
+        self.assertEqual([event["type"] for event in events],
+                         ["state", "progress", "issue", "state"])
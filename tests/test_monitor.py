@@ -0,0 +1,86 @@
+import time
+import unittest
+from unittest.mock import patch
+from cumulus import Cumulus
+from cumulus.monitor import HealthMonitor, _percentile
+
+TEST_URL = 'https://localhost:8765'
+TEST_AUTH = ('cumulus', 'something')
+
+
+class TestHealthMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = HealthMonitor(
+            {"leaf01": Cumulus(url=TEST_URL, auth=TEST_AUTH)},
+            interval=0.01
+        )
+        self.events = []
+        self.monitor.subscribe(self.events.append)
+
+    def probe(self, response):
+        with patch('cumulus.base.Request.get', side_effect=[response]):
+            self.monitor.probe("leaf01")
+
+    def test_probe(self):
+        self.probe({"uptime": 100})
+        self.probe({"uptime": 110})
+        self.probe(Exception("timeout"))
+        self.probe(Exception("timeout"))
+        self.probe({"uptime": 5})
+
+        self.assertEqual(
+            [(event["type"], event.get("previous")) for event in self.events],
+            [("up", None), ("down", True), ("reboot", None), ("up", False)]
+        )
+        status = self.monitor.status("leaf01")
+        self.assertTrue(status["up"])
+        self.assertEqual(status["uptime"], 5)
+        self.assertEqual(status["reboots"], 1)
+        self.assertEqual(status["failures"], 0)
+        self.assertEqual(set(status["latency"]), {"p50", "p90", "p99", "max"})
+
+    def test_percentile(self):
+        self.assertEqual(_percentile(list(range(1, 11)), 50), 5)
+        self.assertEqual(_percentile(list(range(1, 11)), 90), 9)
+        self.assertEqual(_percentile(list(range(1, 101)), 99), 99)
+        self.assertEqual(_percentile(list(range(1, 101)), 100), 100)
+        self.assertEqual(_percentile([7], 50), 7)
+
+    def test_down_after(self):
+        self.monitor.down_after = 2
+        self.probe({"uptime": 100})
+        self.probe(Exception("timeout"))
+        self.assertEqual(len(self.events), 1)
+        self.probe(Exception("timeout"))
+        self.assertEqual(self.events[-1]["type"], "down")
+        self.assertEqual(self.monitor.status()["leaf01"]["error"], "timeout")
+
+    def test_subscriber_error(self):
+        def failing(_):
+            raise Exception("failed")
+
+        self.monitor.subscribe(failing)
+        with self.assertLogs("cumulus.monitor"):
+            self.probe({"uptime": 100})
+        self.monitor.unsubscribe(failing)
+        self.assertEqual(len(self.events), 1)
+
+    @patch('cumulus.base.Request.get', return_value={"uptime": 100})
+    def test_run_once(self, get):
+        self.monitor.run_once()
+        get.assert_called_once_with()
+        self.assertEqual(self.events[0]["type"], "up")
+
+    @patch('cumulus.base.Request.get', return_value={"uptime": 100})
+    def test_start(self, get):
+        self.monitor.start()
+        with self.assertRaises(Exception):
+            self.monitor.start()
+        deadline = time.monotonic() + 5
+        while get.call_count < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.monitor.stop()
+
+        self.assertGreaterEqual(get.call_count, 3)
+        self.assertEqual([event["type"] for event in self.events], ["up"])
@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest.mock import patch, Mock
+from cumulus import Cumulus
+from cumulus.base import RequestError
+from cumulus.profiling import Profiler, endpoint
+
+TEST_URL = 'https://localhost:8765'
+TEST_AUTH = ('cumulus', 'something')
+
+
+class MockResponse:
+
+    def __init__(self, status_code: int = 200, data: dict = {}) -> None:
+        self.content = json.dumps(data).encode()
+        self.text = self.content.decode()
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.reason = ""
+        self.url = TEST_URL
+        self.elapsed = timedelta(0)
+        self.request = Mock(body=b"{}")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = Profiler(trace_size=0)
+
+    def test_record(self):
+        self.profiler.record("GET /system", 0.5, {"wait": 0.4}, size=10)
+        self.profiler.record("GET /system", 1.5, {"wait": 1.0},
+                             error=True, peak_memory=2048)
+
+        stats = self.profiler.stats()["GET /system"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["total"], 2.0)
+        self.assertEqual(stats["max"], 1.5)
+        self.assertEqual(stats["bytes"], 10)
+        self.assertEqual(stats["peak_memory"], 2048)
+        self.assertEqual(stats["phases"], {"wait": 1.4})
+
+        self.profiler.reset()
+        self.assertEqual(self.profiler.stats(), {})
+
+    def test_model(self):
+        with self.profiler.model("Root.diff"):
+            with self.profiler.model("Root.get"):
+                self.profiler.record("GET /", 10.0, {"wait": 10.0})
+
+        # the request time is excluded from the model time of both calls
+        stats = self.profiler.stats()
+        self.assertEqual(stats["Root.get"]["calls"], 1)
+        self.assertEqual(stats["Root.get"]["phases"]["model"], 0.0)
+        self.assertEqual(stats["Root.diff"]["phases"]["model"], 0.0)
+
+    def test_decode(self):
+        data, peak = self.profiler.decode(MockResponse(data={"a": [1] * 100}))
+        self.assertEqual(data, {"a": [1] * 100})
+        self.assertGreater(peak, 0)
+
+    def test_decode_threads(self):
+        profiler = Profiler(trace_size=0, trace_every=1)
+        started = threading.Barrier(4)
+
+        class SlowResponse(MockResponse):
+            def json(self):
+                data = super().json()
+                time.sleep(0.01)
+                return data
+
+        def decode(_):
+            started.wait()
+            return profiler.decode(SlowResponse(data={"a": [1] * 100}))[1]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            peaks = list(executor.map(decode, range(4)))
+        self.assertTrue(all(peak > 0 for peak in peaks))
+
+    def test_endpoint(self):
+        self.assertEqual(endpoint("get", ""), "GET /")
+        self.assertEqual(endpoint("get", "/revision/17"),
+                         "GET /revision/{rev}")
+        self.assertEqual(endpoint("patch", "/interface/vlan10/link"),
+                         "PATCH /interface/{name}/link")
+        self.assertEqual(
+            endpoint("get", "/bridge/domain/br_default/vlan/10/vni"),
+            "GET /bridge/domain/{name}/vlan/{name}/vni"
+        )
+        self.assertEqual(endpoint("get", "/system/api/12"),
+                         "GET /system/api/{id}")
+
+    def test_report(self):
+        self.profiler.record("GET /system", 0.5, {"wait": 0.4})
+        self.profiler.record("GET /interface", 1.5, {"wait": 1.0})
+
+        lines = self.profiler.report().splitlines()
+        self.assertTrue(lines[0].startswith("endpoint"))
+        self.assertTrue(lines[1].startswith("GET /interface"))
+        self.assertEqual(list(json.loads(self.profiler.report("json"))),
+                         ["GET /interface", "GET /system"])
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "profile.json")
+        self.profiler.dump(path)
+        with open(path) as report_file:
+            self.assertIn("GET /system", json.load(report_file))
+
+
+class TestProfiledClient(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Cumulus(url=TEST_URL, auth=TEST_AUTH, profile=True)
+
+    def test_disabled(self):
+        self.assertIsNone(Cumulus(url=TEST_URL, auth=TEST_AUTH).profiler)
+
+    @patch(
+        'requests.Session.request',
+        return_value=MockResponse(data={"hostname": "leaf01"})
+    )
+    def test_get(self, request: Mock):
+        self.assertEqual(self.api.system.get(), {"hostname": "leaf01"})
+        request.assert_called_once_with(
+            method="get",
+            url=self.api.system.url,
+            data=b"{}",
+            params={},
+            headers={'Content-Type': 'application/json'}
+        )
+
+        stats = self.api.profiler.stats()
+        self.assertEqual(set(stats), {"GET /system", "System.get"})
+        self.assertEqual(set(stats["GET /system"]["phases"]),
+                         {"encode", "wait", "transfer", "decode"})
+        self.assertEqual(stats["GET /system"]["bytes"], 22)
+        self.assertEqual(set(stats["System.get"]["phases"]), {"model"})
+
+    @patch(
+        'requests.Session.request',
+        return_value=MockResponse(status_code=500)
+    )
+    def test_error(self, _):
+        with self.assertRaises(RequestError):
+            self.api.interface.patch(rev="1", data={}, target_path="lo")
+
+        stats = self.api.profiler.stats()
+        self.assertEqual(stats["PATCH /interface/{name}"]["errors"], 1)
+        self.assertEqual(stats["Interface.patch"]["errors"], 1)
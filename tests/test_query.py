@@ -0,0 +1,149 @@
+import json
+import unittest
+from unittest.mock import patch, Mock
+from cumulus import Cumulus
+from cumulus.base import RequestError
+from cumulus.query import compile_selector, scan, select
+
+TEST_URL = 'https://localhost:8765'
+TEST_AUTH = ('cumulus', 'something')
+
+INTERFACES = {
+    "eth0": {"type": "eth",
+             "ip": {"address": {"192.168.200.11/24": {}}},
+             "link": {"mtu": 1500, "state": {"up": {}}}},
+    "lo": {"type": "loopback",
+           "ip": {"address": {"127.0.0.1/8": {}, "::1/128": {}}},
+           "link": {"mtu": 65536, "state": {"up": {}}}},
+    "swp1": {"type": "swp",
+             "ip": {"address": {}},
+             "link": {"mtu": 9216, "state": {"down": {}}}},
+    "swp2": {"type": "swp",
+             "link": {"mtu": 9216, "state": {"up": {}},
+                      "description": "a [tricky] \"value\" {}"}},
+}
+
+
+class TestSelector(unittest.TestCase):
+
+    def test_compile_selector(self):
+        segments = compile_selector("interface/*[type=swp][link.state.up]")
+        self.assertEqual([segment.key for segment in segments],
+                         ["interface", None])
+        self.assertEqual(segments[1].predicates,
+                         ((("type",), "swp"), (("link", "state", "up"), None)))
+        self.assertIs(compile_selector("interface/*[type=swp][link.state.up]"),
+                      segments)
+
+    def test_compile_selector_invalid(self):
+        for selector in ("", "interface//ip", "interface/*[type"):
+            with self.assertRaises(ValueError):
+                compile_selector(selector)
+
+    def test_select(self):
+        matches = dict(select(INTERFACES,
+                              compile_selector("*[link.mtu=9216]/type")))
+        self.assertEqual(matches, {("swp1", "type"): "swp",
+                                   ("swp2", "type"): "swp"})
+
+    def test_scan(self):
+        for text in (json.dumps(INTERFACES),
+                     json.dumps(INTERFACES, indent=2)):
+            keys = []
+            self.assertEqual(
+                scan(text, compile_selector("*/ip/address"),
+                     ("interface",), keys),
+                {"interface/eth0/ip/address": {"192.168.200.11/24": {}},
+                 "interface/lo/ip/address": {"127.0.0.1/8": {},
+                                             "::1/128": {}},
+                 "interface/swp1/ip/address": {}}
+            )
+            self.assertEqual(keys, list(INTERFACES))
+            self.assertEqual(
+                scan(text, compile_selector("*[type=swp][link.state.up]")),
+                {"swp2": INTERFACES["swp2"]}
+            )
+            self.assertEqual(scan(text, compile_selector("*/link/mtu/x")),
+                             {})
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Cumulus(url=TEST_URL, auth=TEST_AUTH)
+
+    @patch(
+        'cumulus.base.Request.get_text',
+        return_value=json.dumps(INTERFACES)
+    )
+    def test_query_parent(self, get_text: Mock):
+        results = self.api.query("interface/*/link/mtu", rev="2")
+        self.assertEqual(results, {"interface/eth0/link/mtu": 1500,
+                                   "interface/lo/link/mtu": 65536,
+                                   "interface/swp1/link/mtu": 9216,
+                                   "interface/swp2/link/mtu": 9216})
+        get_text.assert_called_once_with(params={"rev": "2"})
+
+    def test_query_fan_out(self):
+        with patch('cumulus.base.Request.get_text',
+                   return_value=json.dumps(INTERFACES)):
+            self.api.query("interface/*/type")
+
+        def get_text(self, params):
+            name = self.url.split("/")[-3]
+            if "ip" not in INTERFACES[name]:
+                raise RequestError(Mock(status_code=404))
+            return json.dumps(INTERFACES[name]["ip"]["address"])
+
+        with patch('cumulus.base.Request.get_text', autospec=True,
+                   side_effect=get_text) as mock:
+            results = self.api.query("interface/*/ip/address", key_ttl=60)
+        self.assertEqual(mock.call_count, 4)
+        self.assertEqual(
+            mock.call_args_list[0][0][0].url,
+            f"{self.api.url}/interface/eth0/ip/address"
+        )
+        self.assertEqual(sorted(results), ["interface/eth0/ip/address",
+                                           "interface/lo/ip/address",
+                                           "interface/swp1/ip/address"])
+
+    @patch(
+        'cumulus.base.Request.get_text',
+        return_value=json.dumps(INTERFACES)
+    )
+    def test_query_known_keys(self, get_text: Mock):
+        self.api.query("interface/*/type")
+
+        # known keys are only reused when the caller accepts them
+        self.api.query("interface/*/ip/address")
+        self.assertEqual(get_text.call_count, 2)
+
+        # keys are known per revision
+        self.api.query("interface/*/ip/address", rev="2", key_ttl=60)
+        self.assertEqual(get_text.call_count, 3)
+        get_text.assert_called_with(params={"rev": "2"})
+
+    @patch(
+        'cumulus.base.Request.get_text',
+        return_value=json.dumps(INTERFACES)
+    )
+    def test_query_parent_wins(self, get_text: Mock):
+        self.api._query_engine.max_workers = 2
+        self.api.query("interface/*/type")
+
+        # four keys take more than one round of concurrent GETs
+        results = self.api.query("interface/*/link/mtu", key_ttl=60)
+        self.assertEqual(get_text.call_count, 2)
+        self.assertEqual(len(results), 4)
+
+    def test_query_invalid_strategy(self):
+        with self.assertRaises(ValueError):
+            self.api.query("interface/*/type", strategy="fanout")
+
+    @patch(
+        'cumulus.base.Request.get_text',
+        return_value='{"hostname": "leaf01"}'
+    )
+    def test_query_literal(self, get_text: Mock):
+        results = self.api.query("system")
+        self.assertEqual(results, {"system": {"hostname": "leaf01"}})
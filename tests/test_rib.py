@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch, Mock
+from cumulus import Cumulus
+from cumulus.rib import RibTable
+
+TEST_URL = 'https://localhost:8765'
+TEST_AUTH = ('cumulus', 'something')
+
+
+def route(protocol: str, *nexthops, selected: bool = True) -> dict:
+    entry = {"via": {nexthop: {} for nexthop in nexthops}}
+    if selected:
+        entry["flags"] = {"selected": {}}
+    return {"protocol": {protocol: {"entry-index": {"1": entry}}}}
+
+
+ROUTES = {
+    "0.0.0.0/0": route("bgp", "169.254.0.1", "169.254.0.2"),
+    "10.0.0.0/8": route("static", "10.255.0.1"),
+    "10.1.0.0/16": route("bgp", "169.254.0.2", "169.254.0.1"),
+    "10.1.2.0/24": route("connected", "swp1"),
+    "10.1.2.3/32": {"protocol": {
+        "ospf": {"entry-index": {"1": {"via": {"10.0.0.9": {}}}}},
+        "bgp": {"entry-index": {"1": {"via": {"169.254.0.1": {}},
+                                      "flags": {"selected": {}}}}},
+    }},
+}
+
+
+class TestRibTable(unittest.TestCase):
+
+    def setUp(self):
+        self.rib = RibTable.from_routes(ROUTES)
+
+    def test_from_routes(self):
+        self.assertEqual(len(self.rib), 5)
+        routes = {route["prefix"]: route for route in self.rib}
+        self.assertEqual(routes["10.1.2.3/32"]["protocol"], "bgp")
+        # equal next hop groups are stored once
+        self.assertIs(routes["0.0.0.0/0"]["nexthops"],
+                      routes["10.1.0.0/16"]["nexthops"])
+
+    def test_lookup(self):
+        self.assertEqual(self.rib.lookup("10.1.2.3")["prefix"], "10.1.2.3/32")
+        self.assertEqual(self.rib.lookup("10.1.2.4")["prefix"], "10.1.2.0/24")
+        self.assertEqual(self.rib.lookup("10.1.3.4")["prefix"], "10.1.0.0/16")
+        self.assertEqual(self.rib.lookup("10.2.0.1")["nexthops"],
+                         ("10.255.0.1",))
+        self.assertEqual(self.rib.lookup("8.8.8.8")["prefix"], "0.0.0.0/0")
+        self.assertIsNone(RibTable().lookup("8.8.8.8"))
+
+    def test_lookup_ipv6(self):
+        rib = RibTable("ipv6")
+        rib.add("2001:db8::/32", ("fe80::1",), "bgp")
+        rib.add("2001:db8:0:1::/64", ("fe80::2",), "bgp")
+        rib.add("2001:db8:0:1::1/128", ("swp1",), "connected")
+        rib.add("2001:db8:0:1:8000::/65", ("fe80::3",), "bgp")
+
+        self.assertEqual(rib.lookup("2001:db8:0:1::1")["protocol"],
+                         "connected")
+        self.assertEqual(rib.lookup("2001:db8:0:1::2")["prefix"],
+                         "2001:db8:0:1::/64")
+        self.assertEqual(rib.lookup("2001:db8:0:1:8000::5")["prefix"],
+                         "2001:db8:0:1:8000::/65")
+        self.assertEqual(rib.lookup("2001:db8:ffff::1")["prefix"],
+                         "2001:db8::/32")
+        self.assertIsNone(rib.lookup("2001:db9::1"))
+
+    def test_diff(self):
+        routes = dict(ROUTES)
+        del routes["10.0.0.0/8"]
+        routes["10.1.2.0/24"] = route("connected", "swp2")
+        routes["192.168.0.0/24"] = route("static", "10.255.0.1")
+
+        diff = self.rib.diff(RibTable.from_routes(routes))
+        self.assertEqual(list(diff["added"]), ["192.168.0.0/24"])
+        self.assertEqual(list(diff["removed"]), ["10.0.0.0/8"])
+        old, new = diff["changed"]["10.1.2.0/24"]
+        self.assertEqual((old["nexthops"], new["nexthops"]),
+                         (("swp1",), ("swp2",)))
+        self.assertEqual(self.rib.diff(self.rib),
+                         {"added": {}, "removed": {}, "changed": {}})
+
+
+class TestVrfRib(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.api = Cumulus(url=TEST_URL, auth=TEST_AUTH)
+
+    @patch(
+        'cumulus.base.Request.get',
+        return_value=ROUTES
+    )
+    def test_rib(self, get: Mock):
+        rib = self.api.vrf.rib("default")
+        self.assertIsInstance(rib, RibTable)
+        self.assertEqual(len(rib), 5)
+        self.assertIsNone(self.api.vrf.config)
+        get.assert_called_once_with(params={})
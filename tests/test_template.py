@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import Mock
+from cumulus.template import ConfigTemplate, merge
+
+SITE = {
+    "system": {"timezone": "Etc/UTC", "hostname": "switch"},
+    "service": {"ntp": {"default": {"server": {"10.0.0.1": {}}}}},
+}
+LEAF = {
+    "system": {"hostname": "leaf"},
+    "interface": {"swp1": {"type": "swp"}},
+}
+
+
+class TestMerge(unittest.TestCase):
+
+    def test_merge(self):
+        merged = merge(SITE, LEAF)
+        self.assertEqual(merged, {
+            "system": {"timezone": "Etc/UTC", "hostname": "leaf"},
+            "service": SITE["service"],
+            "interface": {"swp1": {"type": "swp"}},
+        })
+        # untouched subtrees are shared and inputs are not modified
+        self.assertIs(merged["service"], SITE["service"])
+        self.assertIs(merged["interface"], LEAF["interface"])
+        self.assertEqual(SITE["system"]["hostname"], "switch")
+
+    def test_merge_remove(self):
+        merged = merge(SITE, {"service": None,
+                              "system": {"timezone": None},
+                              "vrf": {"mgmt": {"table": None}}})
+        self.assertEqual(merged, {"system": {"hostname": "switch"},
+                                  "vrf": {"mgmt": {}}})
+
+
+class TestConfigTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.template = ConfigTemplate()
+        self.template.set_layer("site", SITE)
+        self.template.set_layer("leaf", LEAF)
+        self.template.set_host("leaf01", ["site", "leaf"],
+                               {"system": {"hostname": "leaf01"}})
+        self.template.set_host("leaf02", ["site", "leaf"],
+                               {"system": {"hostname": "leaf02"}})
+        self.template.set_host("spine01", ["site"])
+
+    def test_render(self):
+        leaf01 = self.template.render("leaf01")
+        leaf02 = self.template.render("leaf02")
+        self.assertEqual(leaf01["system"],
+                         {"timezone": "Etc/UTC", "hostname": "leaf01"})
+        self.assertEqual(leaf02["system"]["hostname"], "leaf02")
+        self.assertIs(leaf01["interface"], leaf02["interface"])
+        self.assertIs(self.template.render("leaf01"), leaf01)
+        self.assertIs(self.template.render("spine01")["service"],
+                      SITE["service"])
+
+    def test_render_changed(self):
+        self.assertEqual(sorted(self.template.render_changed()),
+                         ["leaf01", "leaf02", "spine01"])
+        self.assertEqual(self.template.changed(), [])
+
+        self.template.set_layer("leaf", {"system": {"hostname": "new"}})
+        self.template.set_host("spine01", ["site"],
+                               {"system": {"hostname": "spine01"}})
+        rendered = self.template.render_changed()
+        self.assertEqual(sorted(rendered), ["leaf01", "leaf02", "spine01"])
+        self.assertNotIn("interface", rendered["leaf01"])
+
+        self.template.set_host("leaf02", ["site", "leaf"])
+        self.assertEqual(list(self.template.render_changed()), ["leaf02"])
+
+    def test_remove_host(self):
+        self.template.render("spine01")
+        self.template.remove_host("spine01")
+        self.assertNotIn("spine01", self.template.changed())
+
+    def test_patch(self):
+        root = Mock()
+        self.template.patch(root, "1", "leaf01")
+        root.patch.assert_called_once_with(
+            rev="1", data=self.template.render("leaf01")
+        )
@@ -0,0 +1,148 @@
+import json
+import sys
+import threading
+import unittest
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch, Mock
+from cumulus import Cumulus
+from cumulus.base import RequestError, InvalidData
+from cumulus.transport import BaseSession, Urllib3Session, HTTP2Session
+
+TEST_AUTH = ('cumulus', 'something')
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_):
+        pass
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode()
+        if "/missing" in self.path:
+            status, content = 404, b'{"title": "Not Found"}'
+        elif "/text" in self.path:
+            status, content = 200, b'not json'
+        else:
+            status, content = 200, json.dumps({
+                "method": self.command,
+                "path": self.path,
+                "body": body,
+                "authorization": self.headers.get("Authorization"),
+                "content-type": self.headers.get("Content-Type"),
+            }).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_PATCH = do_POST = do_DELETE = _reply
+
+
+class TestBaseSession(unittest.TestCase):
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            BaseSession()
+
+
+class TestUrllib3Session(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.session = Urllib3Session()
+        cls.api = Cumulus(
+            url="http://127.0.0.1:{}".format(cls.server.server_port),
+            auth=TEST_AUTH,
+            http_session=cls.session
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_get(self):
+        response = self.api.interface.get(
+            "lo", endpoint_params={"rev": "applied"}
+        )
+        self.assertEqual(response["method"], "GET")
+        self.assertEqual(response["path"], "/nvue_v1/interface/lo?rev=applied")
+        self.assertEqual(response["body"], "{}")
+        self.assertEqual(response["content-type"], "application/json")
+        self.assertEqual(response["authorization"],
+                         "Basic Y3VtdWx1czpzb21ldGhpbmc=")
+
+    def test_patch(self):
+        response = self.api.interface.patch(
+            rev="1", data={"10.0.0.1/32": {}}, target_path="lo/ip/address"
+        )
+        self.assertEqual(response["method"], "PATCH")
+        self.assertEqual(response["path"],
+                         "/nvue_v1/interface/lo/ip/address?rev=1")
+        self.assertEqual(json.loads(response["body"]), {"10.0.0.1/32": {}})
+
+    def test_request_error(self):
+        with self.assertRaises(RequestError) as error:
+            self.api.root.get("missing")
+        self.assertEqual(error.exception.response.status_code, 404)
+        self.assertIn("Not Found", error.exception.message)
+
+    def test_invalid_data(self):
+        with self.assertRaises(InvalidData) as error:
+            self.api.root.get("text")
+        self.assertEqual(error.exception.error, "not json")
+
+
+class TestHTTP2Session(unittest.TestCase):
+
+    def setUp(self):
+        self.httpx = Mock()
+        modules = patch.dict(sys.modules, {"httpx": self.httpx, "h2": Mock()})
+        modules.start()
+        self.addCleanup(modules.stop)
+
+    def test_missing_h2(self):
+        with patch.dict(sys.modules, {"h2": None}):
+            with self.assertRaises(ImportError):
+                HTTP2Session()
+
+    def test_send(self):
+        client = self.httpx.Client.return_value
+        client.request.return_value = Mock(
+            status_code=404,
+            reason_phrase="Not Found",
+            headers={"Content-Type": "application/json"},
+            content=b'{"title": "Not Found"}',
+            elapsed=timedelta(milliseconds=3)
+        )
+        session = HTTP2Session(timeout=5)
+        session.auth = TEST_AUTH
+        session.verify = False
+
+        api = Cumulus(url="https://127.0.0.1:8765", auth=TEST_AUTH,
+                      http_session=session)
+        with self.assertRaises(RequestError) as error:
+            api.interface.get("lo")
+
+        self.httpx.Client.assert_called_once_with(
+            http2=True, verify=False, timeout=5
+        )
+        self.assertEqual(
+            client.request.call_args[0],
+            ("GET", "https://127.0.0.1:8765/nvue_v1/interface/lo")
+        )
+        self.assertEqual(client.request.call_args[1]["auth"], TEST_AUTH)
+
+        response = error.exception.response
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.ok)
+        self.assertEqual(response.reason, "Not Found")
+        self.assertEqual(response.json(), {"title": "Not Found"})
+        self.assertEqual(response.elapsed, timedelta(milliseconds=3))